@@ -1,6 +1,11 @@
 import json
 import os
+import threading
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import cache
 from io import BytesIO
 
 import pycurl
@@ -9,12 +14,83 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+@dataclass(frozen=True)
+class Settings:
+    domain: str
+    organization: str
+    project: str
+    session_key: str
+
+
+@cache
+def get_settings() -> Settings:
+    """Connection settings from the environment, read once per process."""
+    return Settings(
+        domain=os.getenv("DOMAIN", ""),
+        organization=os.getenv("ORGANIZATION", ""),
+        project=os.getenv("PROJECT", ""),
+        session_key=os.getenv("SESSION_KEY", ""),
+    )
+
+
+class CurlPool:
+    """Thread-safe pool of reusable curl handles.
+
+    Handles keep their connections open between requests, negotiate HTTP/2
+    over TLS when libcurl supports it, and share one DNS cache, TLS session
+    cache and connection cache, so any handle can reuse any open connection.
+    """
+
+    def __init__(self, max_idle: int = 16) -> None:
+        self.max_idle = max_idle
+        self._share = pycurl.CurlShare()
+        self._share.setopt(pycurl.SH_SHARE, pycurl.LOCK_DATA_DNS)
+        self._share.setopt(pycurl.SH_SHARE, pycurl.LOCK_DATA_SSL_SESSION)
+        if hasattr(pycurl, "LOCK_DATA_CONNECT"):
+            self._share.setopt(pycurl.SH_SHARE, pycurl.LOCK_DATA_CONNECT)
+        self._http2 = bool(pycurl.version_info()[4] & pycurl.VERSION_HTTP2)
+        self._idle: list[pycurl.Curl] = []
+        self._lock = threading.Lock()
+
+    def _configure(self, c: pycurl.Curl) -> None:
+        c.setopt(c.TCP_KEEPALIVE, 1)
+        # The default cache of 5 connections churns under concurrent syncs.
+        c.setopt(c.MAXCONNECTS, self.max_idle)
+        if self._http2:
+            c.setopt(c.HTTP_VERSION, pycurl.CURL_HTTP_VERSION_2TLS)
+
+    @contextmanager
+    def handle(self) -> Iterator[pycurl.Curl]:
+        with self._lock:
+            c = self._idle.pop() if self._idle else None
+        if c is None:
+            c = pycurl.Curl()
+            # Shares survive reset(), so attach once.
+            c.setopt(c.SHARE, self._share)
+        self._configure(c)
+        try:
+            yield c
+        finally:
+            # reset() clears options but keeps open connections and the share.
+            c.reset()
+            with self._lock:
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(c)
+                    c = None
+            if c is not None:
+                c.close()
+
+
+pool = CurlPool()
+
+
 class CurlHelper(ABC):
     def __init__(self):
-        self.domain: str = os.getenv("DOMAIN", "")
-        self.organization: str = os.getenv("ORGANIZATION", "")
-        self.project: str = os.getenv("PROJECT", "")
-        self.session_key: str = os.getenv("SESSION_KEY", "")
+        settings = get_settings()
+        self.domain: str = settings.domain
+        self.organization: str = settings.organization
+        self.project: str = settings.project
+        self.session_key: str = settings.session_key
         self.user_agent: str = (
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
         )
@@ -28,22 +104,25 @@ class CurlHelper(ABC):
             f"user-agent: {self.user_agent}",
         ]
 
-    @abstractmethod
-    def perform_request(self) -> str:
-        pass
-
-
-class CurlGet(CurlHelper):
-    def perform_request(self) -> str:
+    def _perform(
+        self,
+        url: str,
+        headers: list[str],
+        method: str | None = None,
+        body: str | None = None,
+    ) -> str:
         buffer = BytesIO()
-        c = pycurl.Curl()
-        c.setopt(c.URL, self._get_base_url())
-        c.setopt(c.HTTPHEADER, self._get_base_headers())
-        c.setopt(c.WRITEDATA, buffer)
-        c.perform()
-
-        status_code = c.getinfo(pycurl.HTTP_CODE)
-        c.close()
+        with pool.handle() as c:
+            c.setopt(c.URL, url)
+            c.setopt(c.HTTPHEADER, headers)
+            if method is not None:
+                c.setopt(c.CUSTOMREQUEST, method)
+            if body is not None:
+                c.setopt(c.POSTFIELDS, body)
+            c.setopt(c.WRITEDATA, buffer)
+            c.perform()
+
+            status_code = c.getinfo(pycurl.HTTP_CODE)
 
         response = buffer.getvalue().decode("utf-8")
 
@@ -52,6 +131,15 @@ class CurlGet(CurlHelper):
 
         return response
 
+    @abstractmethod
+    def perform_request(self) -> str:
+        pass
+
+
+class CurlGet(CurlHelper):
+    def perform_request(self) -> str:
+        return self._perform(self._get_base_url(), self._get_base_headers())
+
 
 class CurlPost(CurlHelper):
     def __init__(self, file_name: str, content: str):
@@ -60,27 +148,12 @@ class CurlPost(CurlHelper):
         self.content = content
 
     def perform_request(self) -> str:
-        buffer = BytesIO()
-        c = pycurl.Curl()
-        c.setopt(c.URL, self._get_base_url())
-        c.setopt(c.POST, 1)
-        c.setopt(
-            c.HTTPHEADER, self._get_base_headers() + ["content-type: application/json"]
-        )
         data = json.dumps({"file_name": self.file_name, "content": self.content})
-        c.setopt(c.POSTFIELDS, data)
-        c.setopt(c.WRITEDATA, buffer)
-        c.perform()
-
-        status_code = c.getinfo(pycurl.HTTP_CODE)
-        c.close()
-
-        response = buffer.getvalue().decode("utf-8")
-
-        if status_code >= 400:
-            raise Exception(f"HTTP Error {status_code}: {response}")
-
-        return response
+        return self._perform(
+            self._get_base_url(),
+            self._get_base_headers() + ["content-type: application/json"],
+            body=data,
+        )
 
 
 class CurlDelete(CurlHelper):
@@ -89,24 +162,10 @@ class CurlDelete(CurlHelper):
         self.doc_uuid = doc_uuid
 
     def perform_request(self) -> str:
-        buffer = BytesIO()
-        c = pycurl.Curl()
-        c.setopt(c.URL, f"{self._get_base_url()}/{self.doc_uuid}")
-        c.setopt(c.CUSTOMREQUEST, "DELETE")
-        c.setopt(
-            c.HTTPHEADER, self._get_base_headers() + ["content-type: application/json"]
-        )
         data = json.dumps({"docUuid": self.doc_uuid})
-        c.setopt(c.POSTFIELDS, data)
-        c.setopt(c.WRITEDATA, buffer)
-        c.perform()
-
-        status_code = c.getinfo(pycurl.HTTP_CODE)
-        c.close()
-
-        response = buffer.getvalue().decode("utf-8")
-
-        if status_code >= 400:
-            raise Exception(f"HTTP Error {status_code}: {response}")
-
-        return response
+        return self._perform(
+            f"{self._get_base_url()}/{self.doc_uuid}",
+            self._get_base_headers() + ["content-type: application/json"],
+            method="DELETE",
+            body=data,
+        )
@@ -0,0 +1,65 @@
+import json
+import os
+from dataclasses import dataclass, field
+
+INDEX_VERSION = 1
+
+
+@dataclass
+class IndexEntry:
+    size: int
+    mtime_ns: int
+    digest: str
+
+
+@dataclass
+class LocalIndex:
+    """Digests of local files, keyed by path and valid while size and mtime match."""
+
+    entries: dict[str, IndexEntry] = field(default_factory=dict)
+    dirty: bool = False
+
+    @classmethod
+    def load_from_file(cls, filename=".sync_index.json") -> "LocalIndex":
+        try:
+            with open(filename, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return LocalIndex()
+        if data.get("version") != INDEX_VERSION:
+            return LocalIndex()
+        return LocalIndex(
+            {path: IndexEntry(*entry) for path, entry in data["files"].items()}
+        )
+
+    def save_to_file(self, filename=".sync_index.json") -> None:
+        files = {
+            path: [entry.size, entry.mtime_ns, entry.digest]
+            for path, entry in self.entries.items()
+        }
+        with open(filename, "w") as f:
+            json.dump({"version": INDEX_VERSION, "files": files}, f)
+        self.dirty = False
+
+    def lookup(self, path: str, stat: os.stat_result) -> str | None:
+        """The indexed digest of ``path``, unless the file changed since."""
+        entry = self.entries.get(path)
+        if (
+            entry is None
+            or entry.size != stat.st_size
+            or entry.mtime_ns != stat.st_mtime_ns
+        ):
+            return None
+        return entry.digest
+
+    def update(self, path: str, stat: os.stat_result, digest: str) -> None:
+        self.entries[path] = IndexEntry(stat.st_size, stat.st_mtime_ns, digest)
+        self.dirty = True
+
+    def retain(self, paths: set[str]) -> None:
+        """Forget files that are no longer on disk."""
+        stale = self.entries.keys() - paths
+        for path in stale:
+            del self.entries[path]
+        if stale:
+            self.dirty = True
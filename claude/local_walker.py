@@ -0,0 +1,145 @@
+import os
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+# Directories whose path contains any of these are never synced or opened.
+# Exclude anything else with .gitignore or manifest "exclude" rules.
+EXCLUDED_DIR_PARTS = ("node_modules", "build")
+# Version control metadata never holds synced files, whatever .gitignore says.
+EXCLUDED_DIR_NAMES = frozenset({".git", ".hg", ".svn"})
+# A directory holding this file is a virtualenv, whatever it is called.
+VENV_MARKER = "pyvenv.cfg"
+SYNCED_EXTENSIONS = (".css", ".js", ".ts", ".tsx", ".py", ".yml")
+SYNCED_NAMES = frozenset({"manifest.json"})
+
+
+@dataclass(frozen=True)
+class IgnoreRule:
+    pattern: re.Pattern
+    negated: bool
+    dir_only: bool
+
+
+def _glob_to_regex(glob: str) -> str:
+    regex = ""
+    i = 0
+    while i < len(glob):
+        if glob.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+        elif glob.startswith("/**", i) and i + 3 == len(glob):
+            regex += "/.*"
+            i += 3
+        elif glob.startswith("**", i):
+            regex += ".*"
+            i += 2
+        elif glob[i] == "*":
+            regex += "[^/]*"
+            i += 1
+        elif glob[i] == "?":
+            regex += "[^/]"
+            i += 1
+        elif glob[i] == "[" and "]" in glob[i + 2 :]:
+            end = glob.index("]", i + 2)
+            body = glob[i + 1 : end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            regex += f"[{body}]"
+            i = end + 1
+        else:
+            if glob[i] == "\\" and i + 1 < len(glob):
+                i += 1
+            regex += re.escape(glob[i])
+            i += 1
+    return regex
+
+
+def compile_ignore_rule(line: str) -> IgnoreRule | None:
+    """Compile one .gitignore line; None for blank lines and comments."""
+    line = line.rstrip("\n").rstrip(" ")
+    if not line or line.startswith("#"):
+        return None
+    negated = line.startswith("!")
+    if negated:
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    # Patterns with an inner slash are relative to the .gitignore's directory.
+    anchored = "/" in line
+    regex = _glob_to_regex(line.lstrip("/"))
+    if not anchored:
+        regex = "(?:.*/)?" + regex
+    return IgnoreRule(re.compile(regex + r"\Z"), negated, dir_only)
+
+
+def compile_ignore_rules(lines: Iterable[str]) -> list[IgnoreRule]:
+    return [rule for line in lines if (rule := compile_ignore_rule(line))]
+
+
+def _read_gitignore(directory: str) -> list[IgnoreRule]:
+    try:
+        with open(os.path.join(directory, ".gitignore"), "r") as f:
+            return compile_ignore_rules(f)
+    except OSError:
+        return []
+
+
+def _is_ignored(
+    rule_sets: list[tuple[str, list[IgnoreRule]]], path: str, is_dir: bool
+) -> bool:
+    # Like git: deeper files win over shallower ones, later lines over earlier.
+    ignored = False
+    for base, rules in rule_sets:
+        relative = path[len(base) :] if base else path
+        for rule in rules:
+            if rule.dir_only and not is_dir:
+                continue
+            if rule.pattern.match(relative):
+                ignored = not rule.negated
+    return ignored
+
+
+def _is_excluded_dir(entry: os.DirEntry, relative: str) -> bool:
+    return (
+        entry.name in EXCLUDED_DIR_NAMES
+        or any(part in relative for part in EXCLUDED_DIR_PARTS)
+        or os.path.exists(os.path.join(entry.path, VENV_MARKER))
+    )
+
+
+def walk_local_files(
+    directory: str = ".", exclude_patterns: Iterable[str] = ()
+) -> Iterator[tuple[str, os.DirEntry]]:
+    """Yield ``(relative path, entry)`` for every local file that should sync.
+
+    Version control and virtualenv directories, directories whose path
+    contains an EXCLUDED_DIR_PARTS entry, and directories ignored by a
+    .gitignore or by ``exclude_patterns`` (gitignore syntax, relative to
+    ``directory``) are pruned without being opened.
+    """
+    excludes = compile_ignore_rules(exclude_patterns)
+    stack = [("", [])]
+    while stack:
+        prefix, rule_sets = stack.pop()
+        path = os.path.join(directory, prefix)
+        if rules := _read_gitignore(path):
+            rule_sets = rule_sets + [(prefix, rules)]
+        # Manifest excludes are applied last, so they override .gitignore.
+        checked = rule_sets + [("", excludes)]
+        subdirs = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                relative = prefix + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if not _is_excluded_dir(entry, relative) and not _is_ignored(
+                        checked, relative, True
+                    ):
+                        subdirs.append(relative + "/")
+                elif (
+                    entry.name.endswith(SYNCED_EXTENSIONS) or entry.name in SYNCED_NAMES
+                ) and not _is_ignored(checked, relative, False):
+                    yield relative, entry
+        stack.extend((subdir, rule_sets) for subdir in sorted(subdirs, reverse=True))
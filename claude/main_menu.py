@@ -2,6 +2,7 @@ from delete_menu import DeleteMenu
 from file_list_menu import FileListMenu
 from manifest_menu import ManifestMenu
 from menu import Menu, MenuAction, MenuOption
+from sync_menu import SyncAllOption
 from sync_state import SyncManager
 
 
@@ -17,6 +18,7 @@ class MainMenu(Menu):
             option.run()
         self.add_option(FileListMenu(self.sync_manager))
         self.add_option(DeleteMenu(self.sync_manager))
+        self.add_option(SyncAllOption(self.sync_manager))
         self.add_option(ManifestMenu(self.sync_manager))
         self.add_option(option)
 
@@ -1,11 +1,17 @@
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+from path_trie import PrefixTrie
 
 
 @dataclass
 class Manifest:
     files: list[dict[str, str]]
     rules: list[dict[str, str]]
+    # (local -> remote, remote -> local) directory_match tries, built on demand.
+    _path_tries: tuple[PrefixTrie, PrefixTrie] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     @classmethod
     def load_from_file(cls, filename="manifest.json") -> "Manifest":
@@ -17,22 +23,48 @@ class Manifest:
 
     def save_to_file(self, filename="manifest.json") -> None:
         with open(filename, "w") as f:
-            json.dump(self.__dict__, f, indent=2)
+            json.dump(self.to_dict(), f, indent=2)
+
+    def to_dict(self) -> dict[str, list[dict[str, str]]]:
+        return {"files": self.files, "rules": self.rules}
 
     def add_directory_match_rule(self, source: str, target: str) -> None:
         new_rule = {"type": "directory_match", "source": source, "target": target}
         self.rules.append(new_rule)
+        self._path_tries = None
 
     def remove_directory_match_rule(self, source: str, target: str) -> None:
         self.rules = [
             rule
-            for rule in self.state.manifest.rules
+            for rule in self.rules
             if not (
                 rule["type"] == "directory_match"
                 and rule["source"] == source
                 and rule["target"] == target
             )
         ]
+        self._path_tries = None
 
     def get_directory_match_rules(self) -> list[dict[str, str]]:
         return [rule for rule in self.rules if rule["type"] == "directory_match"]
+
+    def get_exclude_patterns(self) -> list[str]:
+        """Gitignore-style patterns of local paths that are never synced."""
+        return [rule["pattern"] for rule in self.rules if rule["type"] == "exclude"]
+
+    def _get_path_tries(self) -> tuple[PrefixTrie, PrefixTrie]:
+        if self._path_tries is None:
+            to_remote, to_local = PrefixTrie(), PrefixTrie()
+            for rule in self.get_directory_match_rules():
+                to_remote.insert(rule["source"], rule["target"])
+                to_local.insert(rule["target"], rule["source"])
+            self._path_tries = (to_remote, to_local)
+        return self._path_tries
+
+    def map_local_path(self, local_path: str) -> str:
+        """Apply the directory_match rule with the longest matching source."""
+        return self._get_path_tries()[0].replace_prefix(local_path)
+
+    def map_remote_path(self, remote_path: str) -> str:
+        """Apply the directory_match rule with the longest matching target."""
+        return self._get_path_tries()[1].replace_prefix(remote_path)
@@ -0,0 +1,38 @@
+class PrefixTrie:
+    """Maps string prefixes to values, with longest-prefix lookup.
+
+    Prefixes are matched character by character, like ``str.startswith``, so a
+    lookup costs O(len(path)) however many prefixes are stored.
+    """
+
+    def __init__(self) -> None:
+        self._root: dict = {}
+
+    def insert(self, prefix: str, value: str) -> None:
+        """Map ``prefix`` to ``value``; the first value for a prefix is kept."""
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node.setdefault(None, value)
+
+    def longest_prefix(self, path: str) -> tuple[str, str] | None:
+        """The longest stored prefix of ``path`` and its value, if any."""
+        node = self._root
+        match = (0, node[None]) if None in node else None
+        for depth, char in enumerate(path, 1):
+            node = node.get(char)
+            if node is None:
+                break
+            if None in node:
+                match = (depth, node[None])
+        if match is None:
+            return None
+        return path[: match[0]], match[1]
+
+    def replace_prefix(self, path: str) -> str:
+        """``path`` with its longest stored prefix replaced by that prefix's value."""
+        match = self.longest_prefix(path)
+        if match is None:
+            return path
+        prefix, value = match
+        return value + path[len(prefix) :]
@@ -0,0 +1,47 @@
+from menu import MenuAction, MenuOption
+from sync_state import SyncManager
+
+
+class SyncAllOption(MenuOption):
+    def __init__(self, sync_manager: SyncManager) -> None:
+        super().__init__("Sync All Files")
+        self.sync_manager = sync_manager
+
+    def run(self) -> MenuAction:
+        pending = [
+            file
+            for file in self.sync_manager.state.files.values()
+            if not file.is_fully_synced and (file.local_present or file.remote_present)
+        ]
+        if not pending:
+            print("All files are in sync.")
+            return MenuAction.CONTINUE
+
+        for file in sorted(pending, key=lambda f: f.local_path):
+            if not file.local_present:
+                print(f"  delete    {file.remote_path}")
+            elif not file.remote_present:
+                print(f"  upload    {file.local_path}")
+            else:
+                print(f"  overwrite {file.remote_path}")
+        confirm = input(f"Sync {len(pending)} files? (y/n): ")
+        if confirm.lower() != "y":
+            print("Sync cancelled.")
+            return MenuAction.CONTINUE
+
+        results = self.sync_manager.sync_files(pending)
+
+        print(f"\n{'Action':<10} | {'Result':<6} | File")
+        print("-" * 10)
+        for result in results:
+            status = "✅" if result.succeeded else "❌"
+            path = result.file.local_path or result.file.remote_path
+            print(f"{result.action:<10} | {status:<6} | {path}")
+            if not result.succeeded:
+                print(f"{'':<10} | {'':<6} | {result.error}")
+        failed = sum(not result.succeeded for result in results)
+        print(f"{len(results) - failed} synced, {failed} failed.")
+
+        print("Refreshing remote files...")
+        self.sync_manager.fetch_and_compare()
+        return MenuAction.CONTINUE
@@ -1,23 +1,44 @@
+import hashlib
 import json
 import os
 from abc import ABC
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 
 from curl_helper import CurlDelete, CurlGet, CurlPost
+from local_index import LocalIndex
+from local_walker import walk_local_files
 from manifest import Manifest
 
+DEFAULT_SYNC_CONCURRENCY = 8
+
+
+def digest(contents: str) -> str:
+    return hashlib.blake2b(contents.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def uploaded_uuid(response: str) -> str | None:
+    """The uuid of the document an upload created, if its response names one."""
+    try:
+        return json.loads(response).get("uuid")
+    except (TypeError, ValueError, AttributeError):
+        return None
+
 
 @dataclass
 class File(ABC):
+    """One synced path. Contents are not kept, only a digest of each side."""
+
     local_path: str
-    local_contents: str
+    local_digest: str | None
     remote_path: str
-    remote_contents: str
+    remote_digest: str | None
     remote_uuid: str | None
 
     @property
     def local_present(self) -> bool:
-        return self.local_contents != ""
+        return self.local_digest is not None
 
     @property
     def remote_present(self) -> bool:
@@ -27,7 +48,20 @@ class File(ABC):
     def is_fully_synced(self) -> bool:
         if not self.local_present:
             return False
-        return self.local_contents == self.remote_contents
+        return self.local_digest == self.remote_digest
+
+
+@dataclass
+class SyncResult:
+    file: File
+    action: str
+    error: Exception | None = None
+    # The new remote document, for uploads and overwrites.
+    remote_uuid: str | None = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
 
 
 @dataclass
@@ -35,12 +69,23 @@ class SyncState:
     files: dict[str, File] = field(default_factory=dict)
     fetched: bool = False
     manifest: Manifest = field(default_factory=lambda: Manifest.load_from_file())
+    index: LocalIndex = field(default_factory=lambda: LocalIndex.load_from_file())
 
 
 class SyncManager:
     def __init__(self):
         self.state = SyncState()
         self.curl_get = CurlGet()
+        # Remote contents by uuid, filled on the first diff. A changed file
+        # gets a new uuid, so entries never go stale.
+        self.remote_contents: dict[str, str] = {}
+        self.sync_concurrency = int(
+            os.getenv("SYNC_CONCURRENCY", DEFAULT_SYNC_CONCURRENCY)
+        )
+        if self.sync_concurrency < 1:
+            raise ValueError(
+                f"SYNC_CONCURRENCY must be at least 1, not {self.sync_concurrency}"
+            )
 
     def fetch_and_compare(self) -> None:
         remote_files = self.fetch_remote_files()
@@ -51,16 +96,16 @@ class SyncManager:
     def add_file(
         self,
         local_path: str,
-        local_contents: str,
+        local_digest: str | None,
         remote_path: str,
-        remote_contents: str,
+        remote_digest: str | None,
         remote_uuid: str | None,
     ) -> None:
         self.state.files[local_path] = File(
             local_path=local_path,
-            local_contents=local_contents,
+            local_digest=local_digest,
             remote_path=remote_path,
-            remote_contents=remote_contents,
+            remote_digest=remote_digest,
             remote_uuid=remote_uuid,
         )
 
@@ -69,46 +114,53 @@ class SyncManager:
             remote_path = remote_file["file_name"]
             local_path = self.infer_local_path(remote_path)
             self.add_file(
-                local_path, "", remote_path, remote_file["content"], remote_file["uuid"]
+                local_path,
+                None,
+                remote_path,
+                digest(remote_file["content"]),
+                remote_file["uuid"],
             )
 
     def get_local_files(self) -> dict[str, str]:
+        """Digest local files, re-reading only those whose size or mtime changed."""
         directory = "."
-        for root, _, files in os.walk(directory):
-            if "node_modules" in root or "build" in root:
+        index = self.state.index
+        seen = set()
+        exclude_patterns = self.state.manifest.get_exclude_patterns()
+        for local_path, entry in walk_local_files(directory, exclude_patterns):
+            stat = entry.stat()
+            seen.add(local_path)
+            local_digest = index.lookup(local_path, stat)
+            if local_digest is None:
+                with open(entry.path, "r") as f:
+                    local_digest = digest(f.read())
+                index.update(local_path, stat, local_digest)
+
+            if local_path in self.state.files:
+                self.state.files[local_path].local_digest = local_digest
                 continue
-            for file in files:
-                if (
-                    not file.endswith((".css", ".js", ".ts", ".tsx", ".py", ".yml"))
-                    and file != "manifest.json"
-                ):
-                    continue
-                local_path = os.path.relpath(os.path.join(root, file), directory)
-                with open(os.path.join(root, file), "r") as f:
-                    contents = f.read()
-
-                if local_path in self.state.files:
-                    self.state.files[local_path].local_contents = contents
-                    continue
-
-                remote_path = self.infer_remote_path(local_path)
-                self.add_file(local_path, contents, remote_path, "", None)
+
+            remote_path = self.infer_remote_path(local_path)
+            self.add_file(local_path, local_digest, remote_path, None, None)
+
+        index.retain(seen)
+        if index.dirty:
+            index.save_to_file()
 
     def infer_remote_path(self, local_path: str) -> str:
-        for rule in self.state.manifest.rules:
-            if rule["type"] == "directory_match" and local_path.startswith(
-                rule["source"]
-            ):
-                return local_path.replace(rule["source"], rule["target"], 1)
-        return local_path
+        return self.state.manifest.map_local_path(local_path)
 
     def infer_local_path(self, remote_path: str) -> str:
-        for rule in self.state.manifest.rules:
-            if rule["type"] == "directory_match" and remote_path.startswith(
-                rule["target"]
-            ):
-                return remote_path.replace(rule["target"], rule["source"], 1)
-        return remote_path
+        return self.state.manifest.map_remote_path(remote_path)
+
+    def add_directory_match_rule(self, source: str, target: str) -> None:
+        self.state.manifest.add_directory_match_rule(source, target)
+
+    def remove_directory_match_rule(self, source: str, target: str) -> None:
+        self.state.manifest.remove_directory_match_rule(source, target)
+
+    def get_directory_match_rules(self) -> list[dict[str, str]]:
+        return self.state.manifest.get_directory_match_rules()
 
     def save_manifest(self) -> None:
         self.state.manifest.save_to_file()
@@ -123,39 +175,156 @@ class SyncManager:
         except KeyError as e:
             raise ValueError(f"Unexpected response format: {e}")
 
-    def upload_content(self, filename: str, content: str) -> None:
+    def load_local_contents(self, file: File) -> str:
+        with open(file.local_path, "r") as f:
+            return f.read()
+
+    def load_remote_contents(self, file: File) -> str:
+        """The remote contents of ``file``, e.g. to show a diff.
+
+        The first call downloads the remote listing once and keeps every
+        file's contents for the rest of the session.
+        """
+        if file.remote_uuid not in self.remote_contents:
+            for remote_file in self.fetch_remote_files():
+                self.remote_contents[remote_file["uuid"]] = remote_file["content"]
+        try:
+            return self.remote_contents[file.remote_uuid]
+        except KeyError:
+            raise ValueError(f"Remote file not found: {file.remote_path}")
+
+    def upload_content(self, filename: str, content: str) -> str:
+        result = self.post_content(filename, content)
+        print(f"Successfully uploaded {filename}")
+        print(f"Response: {result}")
+        return result
+
+    def post_content(self, filename: str, content: str) -> str:
+        """Upload ``content`` as ``filename`` and return the response, silently."""
         try:
             curl_post = CurlPost(filename, content)
-            result = curl_post.perform_request()
-            print(f"Successfully uploaded {filename}")
-            print(f"Response: {result}")
+            return curl_post.perform_request()
         except Exception as e:
             raise Exception(f"Error uploading {filename}: {e}")
 
-    def upload_file(self, file: File) -> None:
+    def read_local_file(self, file: File) -> str:
         try:
             with open(file.local_path, "r") as f:
-                content = f.read()
-            self.upload_content(file.remote_path, content)
+                return f.read()
         except IOError as e:
             raise IOError(f"Error reading file {file.local_path}: {e}")
 
+    def upload_file(self, file: File) -> None:
+        result = self.upload_content(file.remote_path, self.read_local_file(file))
+        if (remote_uuid := uploaded_uuid(result)) is not None:
+            self.record_upload(file, remote_uuid)
+
     def upload_manifest(self) -> None:
-        manifest_content = json.dumps(self.state.manifest.__dict__, indent=2)
+        manifest_content = json.dumps(self.state.manifest.to_dict(), indent=2)
         self.upload_content("manifest.json", manifest_content)
 
-    def delete_file(self, file: File) -> None:
+    def delete_remote(self, file: File) -> str:
+        """Delete the remote copy of ``file`` and return the response, silently.
+
+        Unlike delete_file, this leaves ``self.state`` alone.
+        """
         if not file.remote_present:
             raise Exception(f"Deleting invalid remote: {file}")
 
         try:
             curl_delete = CurlDelete(file.remote_uuid)
-            result = curl_delete.perform_request()
-            print(f"Successfully deleted: {file.remote_path} ({file.remote_uuid})")
-            print(f"Response: {result}")
+            return curl_delete.perform_request()
         except Exception as e:
             raise Exception(f"Error deleting file {file.remote_path}: {e}")
 
+    def record_upload(self, file: File, remote_uuid: str) -> None:
+        """Record that ``remote_uuid`` now holds the local contents of ``file``."""
+        self.add_file(
+            file.local_path,
+            file.local_digest,
+            file.remote_path,
+            file.local_digest,
+            remote_uuid,
+        )
+
+    def forget_remote(self, file: File) -> None:
+        """Record that the remote copy of ``file`` is gone."""
         self.state.files.pop(file.local_path, None)
         if file.local_present:
-            self.add_file(file.local_path, file.local_contents, "", "", None)
+            self.add_file(
+                file.local_path, file.local_digest, file.remote_path, None, None
+            )
+
+    def delete_file(self, file: File) -> None:
+        result = self.delete_remote(file)
+        print(f"Successfully deleted: {file.remote_path} ({file.remote_uuid})")
+        print(f"Response: {result}")
+        self.forget_remote(file)
+
+    def _transfer(self, file: File) -> SyncResult:
+        # Runs on worker threads: network calls only, no output or state changes.
+        if file.local_present and file.remote_present:
+            action = "overwrite"
+        elif file.local_present:
+            action = "upload"
+        else:
+            action = "delete"
+
+        remote_uuid = None
+        try:
+            # Upload before deleting, so a failed upload keeps the old copy.
+            if file.local_present:
+                response = self.post_content(
+                    file.remote_path, self.read_local_file(file)
+                )
+                remote_uuid = uploaded_uuid(response)
+            if file.remote_present:
+                self.delete_remote(file)
+        except Exception as e:
+            return SyncResult(file, action, e)
+        return SyncResult(file, action, remote_uuid=remote_uuid)
+
+    def sync_file(self, file: File) -> SyncResult:
+        """Make the remote copy of a file match the local one.
+
+        Local-only files are uploaded, remote-only files deleted, and changed
+        files uploaded again with the old copy deleted afterwards. Errors are
+        returned, not raised.
+        """
+        return self.sync_files([file])[0]
+
+    def sync_files(
+        self, files: Iterable[File] | None = None, concurrency: int | None = None
+    ) -> list[SyncResult]:
+        """Sync many files at once, by default every file that is out of sync.
+
+        At most ``concurrency`` transfers (default SYNC_CONCURRENCY) run at a
+        time. One result is returned per file, in order. ``self.state`` is
+        updated on the calling thread once every transfer has finished, so
+        synced files point at their new remote copies.
+        """
+        if files is None:
+            files = [
+                file
+                for file in self.state.files.values()
+                if not file.is_fully_synced
+                and (file.local_present or file.remote_present)
+            ]
+        concurrency = self.sync_concurrency if concurrency is None else concurrency
+        if concurrency < 1:
+            raise ValueError(f"Sync concurrency must be at least 1, not {concurrency}")
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(self._transfer, files))
+        refetch = False
+        for result in results:
+            if not result.succeeded:
+                continue
+            if result.remote_uuid is not None:
+                self.record_upload(result.file, result.remote_uuid)
+            else:
+                self.forget_remote(result.file)
+                # An upload whose response did not name the new document.
+                refetch = refetch or result.file.local_present
+        if refetch:
+            self.fetch_and_compare()
+        return results
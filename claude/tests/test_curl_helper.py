@@ -0,0 +1,59 @@
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from curl_helper import CurlDelete, CurlGet, CurlPool, Settings
+from pytest_mock import MockFixture
+
+
+class DocsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    clients: set = set()
+
+    def _respond(self, status: int, body: bytes) -> None:
+        DocsHandler.clients.add(self.client_address)
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        self._respond(200, b"[]")
+
+    def do_DELETE(self) -> None:
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self._respond(404, b"missing")
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def docs_server(mocker: MockFixture) -> Iterator[str]:
+    DocsHandler.clients = set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), DocsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    domain = f"http://127.0.0.1:{server.server_port}"
+    mocker.patch(
+        "curl_helper.get_settings",
+        return_value=Settings(domain, "org", "project", "key"),
+    )
+    mocker.patch("curl_helper.pool", CurlPool())
+    yield domain
+    server.shutdown()
+    server.server_close()
+
+
+def test_requests_reuse_one_connection(docs_server: str) -> None:
+    for _ in range(3):
+        assert CurlGet().perform_request() == "[]"
+
+    assert len(DocsHandler.clients) == 1
+
+
+def test_error_status_raises(docs_server: str) -> None:
+    with pytest.raises(Exception, match="HTTP Error 404: missing"):
+        CurlDelete("123").perform_request()
+
+    assert CurlGet().perform_request() == "[]"
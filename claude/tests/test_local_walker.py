@@ -0,0 +1,76 @@
+import os
+from pathlib import Path
+
+from local_walker import compile_ignore_rule, walk_local_files
+from pytest_mock import MockFixture
+
+
+def test_ignore_rules_follow_gitignore_syntax() -> None:
+    assert compile_ignore_rule("# comment") is None
+    assert compile_ignore_rule("   ") is None
+
+    generated = compile_ignore_rule("*.gen.ts")
+    assert generated.pattern.match("a.gen.ts")
+    assert generated.pattern.match("src/deep/a.gen.ts")
+    assert not generated.pattern.match("a.ts")
+
+    anchored = compile_ignore_rule("/src/*.py")
+    assert anchored.pattern.match("src/a.py")
+    assert not anchored.pattern.match("lib/src/a.py")
+    assert not anchored.pattern.match("src/sub/a.py")
+
+    assert compile_ignore_rule("docs/**/draft.py").pattern.match("docs/a/b/draft.py")
+    assert compile_ignore_rule("logs/").dir_only
+    assert compile_ignore_rule("!keep.py").negated
+
+
+def test_walk_prunes_ignored_directories(tmp_path: Path, mocker: MockFixture) -> None:
+    for path in [
+        "app.py",
+        "README.md",
+        "manifest.json",
+        "src/main.ts",
+        "src/main.gen.ts",
+        "src/keep.gen.ts",
+        "src/vendor/lib.js",
+        "generated/api.py",
+        "scratch/notes.py",
+        "node_modules/dep/index.js",
+        "web/build/bundle.js",
+        "web/rebuild/chunk.js",
+    ]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text("")
+    (tmp_path / ".gitignore").write_text("generated/\n*.gen.ts\n")
+    (tmp_path / "src" / ".gitignore").write_text("!keep.gen.ts\n/vendor\n")
+    scandir = mocker.spy(os, "scandir")
+
+    paths = sorted(path for path, _ in walk_local_files(str(tmp_path), ["scratch/"]))
+
+    assert paths == ["app.py", "manifest.json", "src/keep.gen.ts", "src/main.ts"]
+    scanned = {Path(call.args[0]).relative_to(tmp_path) for call in scandir.mock_calls}
+    assert scanned == {Path("."), Path("src"), Path("web")}
+
+
+def test_walk_prunes_vcs_and_virtualenv_directories(
+    tmp_path: Path, mocker: MockFixture
+) -> None:
+    for path in [
+        "app.py",
+        ".git/hooks/pre-commit.py",
+        ".git/objects/info.js",
+        ".hg/store/data.py",
+        "env/pyvenv.cfg",
+        "env/lib/site.py",
+        "tools/venv-free/run.py",
+    ]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text("")
+    scandir = mocker.spy(os, "scandir")
+
+    paths = sorted(path for path, _ in walk_local_files(str(tmp_path)))
+
+    assert paths == ["app.py", "tools/venv-free/run.py"]
+    scanned = {Path(call.args[0]).relative_to(tmp_path) for call in scandir.mock_calls}
+    assert not any(path.parts[:1] == (".git",) for path in scanned)
+    assert scanned == {Path("."), Path("tools"), Path("tools/venv-free")}
@@ -74,6 +74,19 @@ def test_view_file_diff_option(mocker: MockFixture) -> None:
     assert result == MenuAction.BACK
 
 
+def test_view_file_diff_option_fetches_nothing_until_asked(
+    mocker: MockFixture,
+) -> None:
+    sync_manager = mocker.Mock(spec=SyncManager)
+    file = mocker.Mock(spec=File)
+    file.local_path = "test_file.txt"
+
+    ViewFileDiffOption(file, sync_manager).update_options()
+
+    sync_manager.load_remote_contents.assert_not_called()
+    sync_manager.fetch_remote_files.assert_not_called()
+
+
 def test_view_file_diff_menu(mocker: MockFixture) -> None:
     sync_manager = mocker.Mock(spec=SyncManager)
     file1 = mocker.Mock(spec=File)
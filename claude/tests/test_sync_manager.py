@@ -1,29 +1,38 @@
+import json
+from pathlib import Path
+
+import pytest
+from local_index import LocalIndex
 from manifest import Manifest
 from pytest_mock import MockFixture
-from sync_state import File, SyncManager, SyncState
+from sync_state import File, SyncManager, SyncState, digest
 
 
-def test_get_local_files(mocker: MockFixture) -> None:
+def test_get_local_files(
+    mocker: MockFixture, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
     mock_manifest = mocker.Mock(spec=Manifest)
     mock_manifest.files = []
     mock_manifest.rules = []
+    mock_manifest.get_exclude_patterns.return_value = []
     mocker.patch("manifest.Manifest.load_from_file", return_value=mock_manifest)
 
     mock_state = mocker.Mock(spec=SyncState)
     mock_state.manifest = mock_manifest
     mock_state.files = {}
+    mock_state.index = LocalIndex()
     mocker.patch("sync_state.SyncState", return_value=mock_state)
 
     sync_manager = SyncManager()
 
-    mocker.patch(
-        "os.walk",
-        return_value=[
-            (".", [], ["file1.py", "file2.js"]),
-            ("./subdir", [], ["file3.ts"]),
-        ],
-    )
-    mocker.patch("builtins.open", mocker.mock_open(read_data="file content"))
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "subdir").mkdir()
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "file1.py").write_text("file content")
+    (tmp_path / "file2.js").write_text("file content")
+    (tmp_path / "notes.txt").write_text("file content")
+    (tmp_path / "subdir" / "file3.ts").write_text("file content")
+    (tmp_path / "node_modules" / "dep.js").write_text("file content")
 
     sync_manager.get_local_files()
 
@@ -73,7 +82,6 @@ def test_upload_file(mocker: MockFixture) -> None:
     mock_file = mocker.Mock(spec=File)
     mock_file.local_path = "test_file.py"
     mock_file.remote_path = "test_file.py"
-    mock_file.local_contents = "test content"
 
     mock_curl_post = mocker.patch("sync_state.CurlPost")
 
@@ -156,10 +164,221 @@ def test_sync_files(mocker: MockFixture) -> None:
 
     sync_manager = SyncManager()
 
-    mocker.patch.object(sync_manager, "upload_file")
-    mocker.patch.object(sync_manager, "delete_file")
+    mocker.patch.object(sync_manager, "read_local_file")
+    mocker.patch.object(sync_manager, "post_content", return_value='{"uuid": "4"}')
+    mocker.patch.object(sync_manager, "delete_remote")
+
+    sync_manager.sync_files()
+
+    sync_manager.post_content.assert_called_once()
+    sync_manager.delete_remote.assert_called_once()
+
+
+def test_sync_files_reports_each_file(mocker: MockFixture) -> None:
+    mocker.patch("manifest.Manifest.load_from_file", return_value=Manifest([], []))
+
+    sync_manager = SyncManager()
+
+    local_only = File("new.py", digest("new"), "new.py", None, None)
+    changed = File("changed.py", digest("local"), "changed.py", digest("remote"), "1")
+    broken = File("broken.py", digest("broken"), "broken.py", digest("old"), "2")
+    remote_only = File("gone.py", None, "gone.py", digest("gone"), "3")
+    for file in (local_only, changed, broken, remote_only):
+        sync_manager.state.files[file.local_path] = file
+
+    calls = []
+
+    def post(filename: str, content: str) -> str:
+        calls.append(("post", filename))
+        if filename == "broken.py":
+            raise IOError("disk error")
+        return json.dumps({"file_name": filename, "uuid": f"new-{filename}"})
+
+    mocker.patch.object(sync_manager, "read_local_file", return_value="contents")
+    mocker.patch.object(sync_manager, "post_content", side_effect=post)
+    mocker.patch.object(
+        sync_manager,
+        "delete_remote",
+        side_effect=lambda file: calls.append(("delete", file.remote_path)),
+    )
+
+    results = sync_manager.sync_files(
+        [local_only, changed, broken, remote_only], concurrency=2
+    )
+
+    assert [result.file for result in results] == [
+        local_only,
+        changed,
+        broken,
+        remote_only,
+    ]
+    assert [result.action for result in results] == [
+        "upload",
+        "overwrite",
+        "overwrite",
+        "delete",
+    ]
+    assert [result.succeeded for result in results] == [True, True, False, True]
+    assert str(results[2].error) == "disk error"
+    # Overwrites upload first; a failed upload keeps the remote copy.
+    assert calls.index(("post", "changed.py")) < calls.index(("delete", "changed.py"))
+    assert ("delete", "broken.py") not in calls
+    files = sync_manager.state.files
+    assert files["new.py"].remote_uuid == "new-new.py"
+    assert files["changed.py"].remote_uuid == "new-changed.py"
+    assert files["changed.py"].is_fully_synced
+    assert files["broken.py"].remote_uuid == "2"
+    assert "gone.py" not in files
+
+
+def test_sync_files_twice(mocker: MockFixture) -> None:
+    mocker.patch("manifest.Manifest.load_from_file", return_value=Manifest([], []))
+
+    sync_manager = SyncManager()
+    local_only = File("new.py", digest("new"), "new.py", None, None)
+    changed = File("changed.py", digest("local"), "changed.py", digest("remote"), "1")
+    for file in (local_only, changed):
+        sync_manager.state.files[file.local_path] = file
+
+    uploads = iter(range(2, 100))
+    mocker.patch.object(sync_manager, "read_local_file", return_value="contents")
+    post = mocker.patch.object(
+        sync_manager,
+        "post_content",
+        side_effect=lambda filename, content: json.dumps(
+            {"file_name": filename, "uuid": str(next(uploads))}
+        ),
+    )
+    delete = mocker.patch.object(sync_manager, "delete_remote")
+
+    sync_manager.sync_files()
+    files = sync_manager.state.files
+    assert all(file.is_fully_synced for file in files.values())
+    assert sync_manager.sync_files() == []
+
+    files["changed.py"].local_digest = digest("edited")
+    sync_manager.sync_files([files["changed.py"]])
+
+    assert [call.args[0] for call in post.call_args_list] == [
+        "new.py",
+        "changed.py",
+        "changed.py",
+    ]
+    assert [call.args[0].remote_uuid for call in delete.call_args_list] == ["1", "3"]
+    assert files["changed.py"].remote_uuid == "4"
+
+
+def test_sync_files_refetches_when_uploads_are_unnamed(mocker: MockFixture) -> None:
+    mocker.patch("manifest.Manifest.load_from_file", return_value=Manifest([], []))
+
+    sync_manager = SyncManager()
+    local_only = File("new.py", digest("new"), "new.py", None, None)
+    sync_manager.state.files["new.py"] = local_only
+    mocker.patch.object(sync_manager, "read_local_file", return_value="new")
+    mocker.patch.object(sync_manager, "post_content", return_value="OK")
+    fetch = mocker.patch.object(sync_manager, "fetch_and_compare")
 
     sync_manager.sync_files()
 
-    sync_manager.upload_file.assert_called_once()
-    sync_manager.delete_file.assert_called_once()
+    fetch.assert_called_once_with()
+    assert sync_manager.state.files["new.py"].remote_path == "new.py"
+
+
+def test_sync_concurrency_must_be_positive(
+    mocker: MockFixture, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    mocker.patch("manifest.Manifest.load_from_file", return_value=Manifest([], []))
+    monkeypatch.setenv("SYNC_CONCURRENCY", "0")
+
+    with pytest.raises(ValueError, match="at least 1"):
+        SyncManager()
+
+    monkeypatch.delenv("SYNC_CONCURRENCY")
+    with pytest.raises(ValueError, match="at least 1"):
+        SyncManager().sync_files([], concurrency=0)
+
+
+def test_files_are_compared_by_digest(
+    mocker: MockFixture, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    mocker.patch("manifest.Manifest.load_from_file", return_value=Manifest([], []))
+
+    sync_manager = SyncManager()
+    sync_manager.process_remote_files(
+        [
+            {"file_name": "same.py", "content": "same", "uuid": "1"},
+            {"file_name": "changed.py", "content": "old", "uuid": "2"},
+        ]
+    )
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "same.py").write_text("same")
+    (tmp_path / "changed.py").write_text("new")
+    (tmp_path / "new.py").write_text("")
+
+    sync_manager.get_local_files()
+
+    files = sync_manager.state.files
+    assert files["same.py"].is_fully_synced
+    assert not files["changed.py"].is_fully_synced
+    assert files["new.py"].local_present
+    assert files["changed.py"].remote_digest == digest("old")
+    assert not hasattr(files["changed.py"], "remote_contents")
+
+    fetch = mocker.patch.object(
+        sync_manager,
+        "fetch_remote_files",
+        return_value=[
+            {"file_name": "same.py", "content": "same", "uuid": "1"},
+            {"file_name": "changed.py", "content": "old", "uuid": "2"},
+        ],
+    )
+    assert sync_manager.load_remote_contents(files["changed.py"]) == "old"
+    assert sync_manager.load_remote_contents(files["changed.py"]) == "old"
+    assert sync_manager.load_remote_contents(files["same.py"]) == "same"
+    fetch.assert_called_once_with()
+
+
+def test_get_local_files_reads_only_changed_files(
+    mocker: MockFixture, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    mocker.patch("manifest.Manifest.load_from_file", return_value=Manifest([], []))
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "kept.py").write_text("kept")
+    (tmp_path / "touched.py").write_text("old")
+    (tmp_path / "removed.py").write_text("removed")
+    SyncManager().get_local_files()
+
+    (tmp_path / "touched.py").write_text("new!")
+    (tmp_path / "removed.py").unlink()
+    update = mocker.spy(LocalIndex, "update")
+    sync_manager = SyncManager()
+    sync_manager.get_local_files()
+
+    assert [call.args[1] for call in update.call_args_list] == ["touched.py"]
+    assert sync_manager.state.files["kept.py"].local_digest == digest("kept")
+    assert sync_manager.state.files["touched.py"].local_digest == digest("new!")
+    assert set(LocalIndex.load_from_file().entries) == {"kept.py", "touched.py"}
+
+
+def test_infer_paths_use_longest_matching_rule(mocker: MockFixture) -> None:
+    manifest = Manifest([], [])
+    manifest.add_directory_match_rule("src/", "app/")
+    manifest.add_directory_match_rule("src/components/", "ui/")
+    mocker.patch("manifest.Manifest.load_from_file", return_value=manifest)
+    sync_manager = SyncManager()
+
+    assert sync_manager.infer_remote_path("src/main.ts") == "app/main.ts"
+    assert sync_manager.infer_remote_path("src/components/A.tsx") == "ui/A.tsx"
+    assert sync_manager.infer_remote_path("lib/util.py") == "lib/util.py"
+    assert sync_manager.infer_local_path("ui/A.tsx") == "src/components/A.tsx"
+
+    sync_manager.remove_directory_match_rule("src/components/", "ui/")
+
+    assert (
+        sync_manager.infer_remote_path("src/components/A.tsx") == "app/components/A.tsx"
+    )
+    assert sync_manager.infer_local_path("ui/A.tsx") == "ui/A.tsx"
+    assert manifest.to_dict() == {
+        "files": [],
+        "rules": [{"type": "directory_match", "source": "src/", "target": "app/"}],
+    }
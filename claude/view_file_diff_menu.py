@@ -44,16 +44,15 @@ class ViewFileDiffOption(TaskMenu):
 
     def update_options(self) -> None:
         self.options.clear()
-        display_diff = DisplayDiff(self.file)
-        display_diff.run()
         self.add_option(OverwriteRemote(self.file, self.sync_manager))
-        self.add_option(DisplayDiff(self.file))
+        self.add_option(DisplayDiff(self.file, self.sync_manager))
 
 
 class DisplayDiff(Menu):
-    def __init__(self, file: File) -> None:
+    def __init__(self, file: File, sync_manager: SyncManager) -> None:
         super().__init__("Display Diff")
         self.file = file
+        self.sync_manager = sync_manager
 
     def run(self) -> MenuAction:
         if not self.file.local_present:
@@ -64,8 +63,10 @@ class DisplayDiff(Menu):
             print(f"\nFile only exists locally: {self.file.local_path}")
             return
 
-        local_lines = self.file.local_contents.splitlines(keepends=True)
-        remote_lines = self.file.remote_contents.splitlines(keepends=True)
+        local_contents = self.sync_manager.load_local_contents(self.file)
+        remote_contents = self.sync_manager.load_remote_contents(self.file)
+        local_lines = local_contents.splitlines(keepends=True)
+        remote_lines = remote_contents.splitlines(keepends=True)
 
         diff = difflib.unified_diff(
             remote_lines,
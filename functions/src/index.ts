@@ -305,12 +305,37 @@ export const markNotificationRead = onRequest(
           return;
         }
         try {
-          const notificationRef = db
-            .collection("users")
-            .doc(uid)
-            .collection("notifications")
-            .doc(notificationId);
-          await notificationRef.update({ read: true });
+          const userRef = db.collection("users").doc(uid);
+          const notificationsRef = userRef.collection("notifications");
+          const notificationRef = notificationsRef.doc(notificationId);
+          const counterRef = userRef
+            .collection("counters")
+            .doc("notifications");
+          // Flip read and move the unread counter together, as
+          // gcf/common/notifications.py does.
+          await db.runTransaction(async (transaction) => {
+            const [notification, counter] = await transaction.getAll(
+              notificationRef,
+              counterRef,
+            );
+            if (!notification.exists) {
+              throw new Error(`Notification ${notificationId} not found`);
+            }
+            if (notification.get("read")) {
+              return;
+            }
+            if (counter.exists) {
+              transaction.update(counterRef, {
+                unread: FieldValue.increment(-1),
+              });
+            } else {
+              const unread = await transaction.get(
+                notificationsRef.where("read", "==", false).count(),
+              );
+              transaction.set(counterRef, { unread: unread.data().count - 1 });
+            }
+            transaction.update(notificationRef, { read: true });
+          });
           response.json({
             success: true,
             message: "Notification marked as read",
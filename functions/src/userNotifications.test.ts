@@ -1,5 +1,9 @@
 import { getAuth } from "firebase-admin/auth";
-import { Timestamp, getFirestore } from "firebase-admin/firestore";
+import {
+  FieldValue,
+  Timestamp,
+  getFirestore,
+} from "firebase-admin/firestore";
 import type { Request, Response } from "firebase-functions";
 import * as logger from "firebase-functions/logger";
 import { userNotifications } from "./index";
@@ -18,6 +22,8 @@ interface MockAuth {
 
 interface MockFirestore {
   collection: jest.Mock;
+  get: jest.Mock;
+  batch: jest.Mock;
 }
 
 jest.mock("firebase-admin/auth", () => ({
@@ -32,6 +38,8 @@ jest.mock("firebase-admin/firestore", () => {
     doc: jest.fn().mockReturnThis(),
     get: jest.fn(),
     add: jest.fn(),
+    batch: jest.fn(),
+    id: "welcome-id",
     orderBy: jest.fn().mockReturnThis(),
     limit: jest.fn().mockReturnThis(),
   };
@@ -161,6 +169,51 @@ describe("userNotifications function", () => {
     );
   });
 
+  it("should seed a welcome notification and count it as unread", async () => {
+    mockAuth.verifyIdToken.mockResolvedValue({ uid: "mock-uid" });
+    mockFirestore.get
+      .mockResolvedValueOnce({ docs: [] })
+      .mockResolvedValueOnce({ data: () => ({ name: "Alice" }) });
+    const mockBatch = { set: jest.fn(), commit: jest.fn() };
+    mockFirestore.batch.mockReturnValue(mockBatch);
+
+    const res = {
+      json: jest.fn(),
+      status: jest.fn().mockReturnThis(),
+    } as unknown as Response;
+
+    await userNotifications(
+      createCustomRequest<{ idToken: string }>({ idToken: "valid-id-token" }),
+      res,
+    );
+
+    expect(mockBatch.set).toHaveBeenCalledWith(expect.anything(), {
+      message: "Welcome to GrindOlympiads, Alice!",
+      timestamp: expect.anything(),
+      read: false,
+    });
+    expect(mockBatch.set).toHaveBeenCalledWith(
+      expect.anything(),
+      { unread: FieldValue.increment(1) },
+      { merge: true },
+    );
+    expect(mockBatch.commit).toHaveBeenCalled();
+    expect(res.json).toHaveBeenCalledWith({
+      success: true,
+      message: "Operation successful",
+      data: {
+        notifications: [
+          {
+            id: "welcome-id",
+            message: "Welcome to GrindOlympiads, Alice!",
+            timestamp: "2023-01-01T00:00:00.000Z",
+            read: false,
+          },
+        ],
+      },
+    });
+  });
+
   it("should handle missing ID token", async () => {
     const res = {
       json: jest.fn(),
@@ -1,5 +1,5 @@
 import type { Request } from "express";
-import { Timestamp } from "firebase-admin/firestore";
+import { FieldValue, Timestamp } from "firebase-admin/firestore";
 import * as logger from "firebase-functions/logger";
 import { type Dependencies, createAuthenticatedFunction } from "./utils";
 
@@ -47,7 +47,17 @@ const userNotificationsHandler = async (
       timestamp: now,
       read: false,
     };
-    const newNotificationRef = await notificationsRef.add(welcomeNotification);
+    // The welcome is the user's first notification, so bumping the unread
+    // counter in the same batch keeps it exact whether or not it exists yet.
+    const newNotificationRef = notificationsRef.doc();
+    const batch = db.batch();
+    batch.set(newNotificationRef, welcomeNotification);
+    batch.set(
+      userRef.collection("counters").doc("notifications"),
+      { unread: FieldValue.increment(1) },
+      { merge: true },
+    );
+    await batch.commit();
     notifications = [
       {
         id: newNotificationRef.id,
@@ -0,0 +1,223 @@
+"""Async variants of the read-heavy gcf handlers, served as an ASGI app.
+
+The handlers use the Firestore AsyncClient and issue independent reads with
+asyncio.gather, so one instance can hold many requests open without a
+thread per request. Validation, bundles, payloads and caches come from
+``common``, so these handlers serve the same bytes as the Flask functions.
+Run with any ASGI server, e.g.
+
+    uvicorn asgi:app --port 8080
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+
+from common import catalog
+from common.auth import AuthError, authenticate, bearer_token
+from common.bundles import check_segment, get_bundle_store
+from common.exam_data import (
+    CACHE_MAX_AGE,
+    EXAMS_CACHE_KEY,
+    bundle_response,
+    cache_public_exams,
+    exam_cache,
+    exam_payload,
+    exams_cache,
+    problems_query,
+)
+from common.firestore import get_async_client, get_client
+from common.pagination import decode_page_token, page_query, parse_page_size, split_page
+from common.projection import parse_fields
+from common.responses import cached_json_response, serialize_payload
+from flask import Request, Response
+
+HEADERS = {"Access-Control-Allow-Origin": "*"}
+
+
+def json_response(payload, status: int = 200) -> Response:
+    return Response(
+        serialize_payload(payload).body,
+        status=status,
+        headers=HEADERS,
+        mimetype="application/json",
+    )
+
+
+def request_from_scope(scope: dict) -> Request:
+    """A request object over an ASGI HTTP scope, for the shared helpers.
+
+    The body is never read; these handlers only take query arguments.
+    """
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "PATH_INFO": scope["path"],
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+    }
+    for name, value in scope["headers"]:
+        key = name.decode("latin-1").upper().replace("-", "_")
+        if key not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            key = f"HTTP_{key}"
+        value = value.decode("latin-1")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return Request(environ)
+
+
+async def user_id_for(request: Request) -> str:
+    # Verification is CPU-bound and the revocation check may refresh from
+    # Firestore, so keep both off the event loop.
+    return await asyncio.to_thread(authenticate, bearer_token(request))
+
+
+async def get_exam_data(request: Request) -> Response:
+    competition = request.args.get("competition")
+    year = request.args.get("year")
+    exam = request.args.get("exam")
+    if not all([competition, year, exam]):
+        return json_response(
+            {"error": "Missing parameters", "competition": competition}, 400
+        )
+    try:
+        for segment in (competition, year, exam):
+            check_segment(segment)
+        fields = parse_fields(request.args.get("fields"))
+    except ValueError as e:
+        return json_response({"error": str(e)}, 400)
+
+    bundle_store = get_bundle_store()
+    if bundle_store is not None and fields is None:
+        # Bundle stores are synchronous; a store read blocks until cached.
+        response = await asyncio.to_thread(
+            bundle_response, request, bundle_store, competition, year, exam, HEADERS
+        )
+        if response is not None:
+            return response
+
+    cache_key = (competition, year, exam, fields)
+    cached = exam_cache.get(cache_key)
+    if cached is None:
+        exam_ref = get_async_client().collection(competition).document(year)
+        exam_ref = exam_ref.collection(exam)
+        problems, comment_doc = await asyncio.gather(
+            collect(problems_query(exam_ref, fields).stream()),
+            exam_ref.document("Comment").get(),
+        )
+        cached = serialize_payload(
+            exam_payload(competition, year, exam, problems, comment_doc)
+        )
+        exam_cache.set(cache_key, cached)
+
+    return cached_json_response(request, cached, HEADERS, CACHE_MAX_AGE)
+
+
+async def list_exams(request: Request) -> Response:
+    cached = exams_cache.get(EXAMS_CACHE_KEY)
+    if cached is None:
+        db = get_async_client()
+        shard_docs = await collect(db.get_all(catalog.catalog_refs(db)))
+        rows = catalog.catalog_rows(shard_docs)
+        if rows is None:
+            rows = await asyncio.to_thread(catalog.rebuild_catalog, get_client())
+        cached = cache_public_exams(rows)
+
+    return cached_json_response(request, cached, HEADERS, CACHE_MAX_AGE)
+
+
+async def get_user_info(request: Request) -> Response:
+    user_id = await user_id_for(request)
+    try:
+        fields = parse_fields(request.args.get("fields"))
+    except ValueError as e:
+        return json_response({"error": str(e)}, 400)
+
+    user_ref = get_async_client().collection("users").document(user_id)
+    user_doc = await user_ref.get(field_paths=fields)
+    if not user_doc.exists:
+        return json_response({"error": "User not found"}, 404)
+    return json_response({"user": user_doc.to_dict()})
+
+
+async def user_progress(request: Request) -> Response:
+    user_id = await user_id_for(request)
+    # Like the Flask function: a bare array unless the client asks for a page.
+    paged = "limit" in request.args or "start_after" in request.args
+    try:
+        limit = parse_page_size(request.args.get("limit"))
+        start_after = request.args.get("start_after")
+        if start_after:
+            start_after = decode_page_token(start_after)
+    except ValueError as e:
+        return json_response({"error": str(e)}, 400)
+
+    progress_ref = (
+        get_async_client().collection("users").document(user_id).collection("progress")
+    )
+    if not paged:
+        docs = await collect(progress_ref.stream())
+        return json_response([{**doc.to_dict(), "id": doc.id} for doc in docs])
+
+    docs = await collect(page_query(progress_ref, limit, start_after).stream())
+    progress_docs, next_page_token = split_page(docs, limit)
+    progress_data = [{**doc.to_dict(), "id": doc.id} for doc in progress_docs]
+    return json_response(
+        {"progress": progress_data, "next_page_token": next_page_token}
+    )
+
+
+async def collect(stream) -> list:
+    return [item async for item in stream]
+
+
+ROUTES: dict[str, Callable[[Request], Awaitable[Response]]] = {
+    "/exams": list_exams,
+    "/exam-data": get_exam_data,
+    "/user": get_user_info,
+    "/user-progress": user_progress,
+}
+
+
+async def dispatch(request: Request) -> Response:
+    if request.method == "OPTIONS":
+        return Response(status=204, headers=HEADERS)
+    handler = ROUTES.get(request.path.rstrip("/"))
+    if handler is None:
+        return json_response({"error": f"Unknown path: {request.path}"}, 404)
+    try:
+        return await handler(request)
+    except AuthError as e:
+        return json_response({"error": str(e)}, 401)
+    except Exception as e:
+        return json_response({"error": str(e)}, 500)
+
+
+async def app(scope: dict, receive, send) -> None:
+    """Minimal ASGI adapter over ``dispatch``."""
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] == "websocket":
+        # Closing before accepting rejects the handshake with a 403.
+        await receive()
+        await send({"type": "websocket.close"})
+        return
+    if scope["type"] != "http":
+        raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+
+    response = await dispatch(request_from_scope(scope))
+    await send(
+        {
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": [
+                (k.lower().encode("latin-1"), v.encode("latin-1"))
+                for k, v in response.headers.items()
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": response.get_data()})
@@ -0,0 +1,89 @@
+"""Measure cold-start cost for each gcf function.
+
+Every function is loaded in a fresh interpreter, as on a new instance, and
+timed for ``import main`` plus its first request. The default probes are
+requests a cold instance commonly sees first and that need no Firestore
+access (preflights, unauthenticated or incomplete calls), so they run
+without credentials; list_exams is left out because its first request
+always reads Firestore. The report also shows whether Firestore was imported.
+
+    python bench/cold_start.py [--runs N]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+GCF_DIR = Path(__file__).resolve().parent.parent
+
+# (function directory, entry point, method, query string)
+PROBES = [
+    ("exam-data", "get_exam_data", "GET", ""),
+    ("user", "get_user_info", "GET", ""),
+    ("user-progress", "user_progress", "GET", ""),
+    ("notifications", "user_notifications", "GET", ""),
+    ("notifications", "unread_notification_count", "OPTIONS", ""),
+    ("update-notification", "mark_notification_read", "OPTIONS", ""),
+    ("update-notification", "mark_notifications_read", "OPTIONS", ""),
+    ("logout", "logout", "OPTIONS", ""),
+    ("bootstrap", "session_bootstrap", "GET", ""),
+]
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+from flask import Flask, request
+app = Flask("cold_start")
+with app.test_request_context("/" + {query!r}, method={method!r}):
+    response = app.make_response(getattr(main, {entry_point!r})(request))
+finished = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "first_request_ms": (finished - imported) * 1000,
+    "status": response.status_code,
+    "firestore_loaded": "google.cloud.firestore_v1" in sys.modules,
+}}))
+"""
+
+
+def measure(function_dir: str, entry_point: str, method: str, query: str) -> dict:
+    code = CHILD.format(entry_point=entry_point, method=method, query=query)
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=GCF_DIR / function_dir,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="gcf cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="cold starts per probe")
+    args = parser.parse_args()
+
+    print(
+        f"{'Function':<52} | {'Import ms':>9} | {'1st req ms':>10} | Status | Firestore"
+    )
+    print("-" * 94)
+    for function_dir, entry_point, method, query in PROBES:
+        samples = [
+            measure(function_dir, entry_point, method, query) for _ in range(args.runs)
+        ]
+        import_ms = statistics.median(s["import_ms"] for s in samples)
+        request_ms = statistics.median(s["first_request_ms"] for s in samples)
+        label = f"{function_dir}:{entry_point} {method}"
+        print(
+            f"{label:<52} | {import_ms:>9.1f} | {request_ms:>10.1f} | "
+            f"{samples[-1]['status']:>6} | {samples[-1]['firestore_loaded']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,551 @@
+"""In-memory stand-in for the slice of the Firestore client the gcf handlers use.
+
+Covers collection/document references, get/get_all, queries (where, order_by,
+limit, start_after, select, count), batches and ``transactional`` functions.
+Reads, writes and round-trips are counted the way Firestore bills them, so a
+benchmark can report per-request costs without touching a real database.
+Transactions take a process-wide lock instead of retrying on contention, and
+``rpc_latency`` adds a fixed delay per round-trip to stand in for the network.
+
+AsyncFakeClient serves the same data through the AsyncClient surface the
+async handlers use, yielding to the event loop on every round-trip.
+
+Sentinels (SERVER_TIMESTAMP, DELETE_FIELD, Increment) come from the real
+client library, which the handlers import anyway. Usage is also reported to
+common.instrumentation, so instrumented handlers see it per request.
+"""
+
+import asyncio
+import copy
+import itertools
+import secrets
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from common.instrumentation import record
+from google.api_core.exceptions import AlreadyExists, NotFound
+from google.cloud.firestore_v1 import DELETE_FIELD, SERVER_TIMESTAMP, Increment
+from google.cloud.firestore_v1.field_path import parse_field_path
+
+DOCUMENT_ID = "__name__"
+
+_MISSING = object()
+
+_OPERATORS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "in": lambda a, b: a in b,
+    "not-in": lambda a, b: a not in b,
+    "array-contains": lambda a, b: isinstance(a, list) and b in a,
+}
+
+
+def _get_path(data: dict, parts: list[str]):
+    for part in parts:
+        if not isinstance(data, dict) or part not in data:
+            return _MISSING
+        data = data[part]
+    return data
+
+
+def _resolve(value, existing=_MISSING):
+    """Replace write sentinels in ``value`` given the field's current value."""
+    if value is SERVER_TIMESTAMP:
+        return datetime.now(timezone.utc)
+    if isinstance(value, Increment):
+        base = existing if isinstance(existing, (int, float)) else 0
+        return base + value.value
+    if isinstance(value, dict):
+        current = existing if isinstance(existing, dict) else {}
+        return {
+            key: _resolve(item, current.get(key, _MISSING))
+            for key, item in value.items()
+            if item is not DELETE_FIELD
+        }
+    return copy.deepcopy(value)
+
+
+def _merge(target: dict, data: dict) -> None:
+    for key, value in data.items():
+        if value is DELETE_FIELD:
+            target.pop(key, None)
+        elif isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge(target[key], value)
+        else:
+            target[key] = _resolve(value, target.get(key, _MISSING))
+
+
+def _update(target: dict, data: dict) -> None:
+    for path, value in data.items():
+        *parents, leaf = parse_field_path(path)
+        node = target
+        for part in parents:
+            if not isinstance(node.get(part), dict):
+                node[part] = {}
+            node = node[part]
+        if value is DELETE_FIELD:
+            node.pop(leaf, None)
+        else:
+            node[leaf] = _resolve(value, node.get(leaf, _MISSING))
+
+
+def _project(data: dict, field_paths) -> dict:
+    projected = {}
+    for path in field_paths:
+        parts = parse_field_path(path)
+        value = _get_path(data, parts)
+        if value is _MISSING:
+            continue
+        node = projected
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = value
+    return projected
+
+
+class FakeClient:
+    """Thread-safe in-memory database with Firestore-style usage counters."""
+
+    def __init__(self, rpc_latency: float = 0.0) -> None:
+        self.rpc_latency = rpc_latency
+        # collection path -> {document id: data}
+        self._documents: dict[str, dict[str, dict]] = defaultdict(dict)
+        # document path ("" for the root) -> ids of its subcollections
+        self._subcollections: dict[str, set[str]] = defaultdict(set)
+        self._lock = threading.RLock()
+        self._stats_lock = threading.Lock()
+        self.stats = Counter()
+
+    def collection(self, collection_id: str) -> "CollectionReference":
+        return CollectionReference(self, collection_id)
+
+    def collections(self) -> list["CollectionReference"]:
+        self._count(rpcs=1, reads=1)
+        with self._lock:
+            return [self.collection(name) for name in sorted(self._subcollections[""])]
+
+    def get_all(self, references, field_paths=None, transaction=None):
+        references = list(references)
+        self._count(rpcs=1, reads=len(references))
+        with self._lock:
+            return [ref._snapshot(field_paths) for ref in references]
+
+    def batch(self) -> "WriteBatch":
+        return WriteBatch(self)
+
+    def transaction(self, **kwargs) -> "Transaction":
+        return Transaction(self)
+
+    def reset_stats(self) -> Counter:
+        """Zero the counters, returning their values until now."""
+        with self._stats_lock:
+            stats, self.stats = self.stats, Counter()
+        return stats
+
+    def _count(self, **amounts: int) -> None:
+        with self._stats_lock:
+            self.stats.update(amounts)
+        if self.rpc_latency and amounts.get("rpcs"):
+            time.sleep(self.rpc_latency)
+        record(**amounts, seconds=self.rpc_latency * amounts.get("rpcs", 0))
+
+    def _register(self, collection_path: str) -> None:
+        """Make ``collection_path`` and its ancestors visible to listings."""
+        parts = collection_path.split("/")
+        for depth in range(1, len(parts) + 1, 2):
+            self._subcollections["/".join(parts[: depth - 1])].add(parts[depth - 1])
+
+    def _apply(self, operation: str, ref: "DocumentReference", data=None, **options):
+        """Apply one write; callers hold ``_lock``."""
+        documents = self._documents[ref._collection_path]
+        existing = documents.get(ref.id)
+        if operation == "create":
+            if existing is not None:
+                raise AlreadyExists(f"Document already exists: {ref.path}")
+            documents[ref.id] = _resolve(data)
+        elif operation == "set":
+            if options.get("merge") and existing is not None:
+                _merge(existing, data)
+            else:
+                documents[ref.id] = _resolve(data)
+        elif operation == "update":
+            if existing is None:
+                raise NotFound(f"No document to update: {ref.path}")
+            _update(existing, data)
+        elif operation == "delete":
+            documents.pop(ref.id, None)
+            return
+        self._register(ref._collection_path)
+
+
+class DocumentSnapshot:
+    def __init__(self, reference: "DocumentReference", data: dict | None) -> None:
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> dict | None:
+        return copy.deepcopy(self._data)
+
+    def get(self, field_path: str):
+        value = _get_path(self._data or {}, parse_field_path(field_path))
+        if value is _MISSING:
+            raise KeyError(field_path)
+        return copy.deepcopy(value)
+
+
+class DocumentReference:
+    def __init__(self, client: FakeClient, collection_path: str, doc_id: str) -> None:
+        self._client = client
+        self._collection_path = collection_path
+        self.id = doc_id
+        self.path = f"{collection_path}/{doc_id}"
+
+    @property
+    def parent(self) -> "CollectionReference":
+        return CollectionReference(self._client, self._collection_path)
+
+    def collection(self, collection_id: str) -> "CollectionReference":
+        return CollectionReference(self._client, f"{self.path}/{collection_id}")
+
+    def collections(self) -> list["CollectionReference"]:
+        self._client._count(rpcs=1, reads=1)
+        with self._client._lock:
+            names = sorted(self._client._subcollections[self.path])
+        return [self.collection(name) for name in names]
+
+    def get(self, field_paths=None, transaction=None) -> DocumentSnapshot:
+        self._client._count(rpcs=1, reads=1)
+        with self._client._lock:
+            return self._snapshot(field_paths)
+
+    def create(self, document_data: dict) -> None:
+        self._write("create", document_data)
+
+    def set(self, document_data: dict, merge: bool = False) -> None:
+        self._write("set", document_data, merge=merge)
+
+    def update(self, field_updates: dict) -> None:
+        self._write("update", field_updates)
+
+    def delete(self) -> None:
+        self._write("delete")
+
+    def _write(self, operation: str, data=None, **options) -> None:
+        self._client._count(rpcs=1, writes=1)
+        with self._client._lock:
+            self._client._apply(operation, self, data, **options)
+
+    def _snapshot(self, field_paths=None) -> DocumentSnapshot:
+        data = self._client._documents[self._collection_path].get(self.id)
+        if data is not None and field_paths is not None:
+            data = _project(data, field_paths)
+        return DocumentSnapshot(self, copy.deepcopy(data))
+
+
+class Query:
+    ASCENDING = "ASCENDING"
+    DESCENDING = "DESCENDING"
+
+    def __init__(self, client: FakeClient, collection_path: str) -> None:
+        self._client = client
+        self._collection_path = collection_path
+        self._filters: tuple = ()
+        self._orders: tuple = ()
+        self._limit: int | None = None
+        self._cursor: dict | None = None
+        self._projection: tuple | None = None
+
+    def _copy(self, **changes) -> "Query":
+        query = copy.copy(self)
+        query.__class__ = Query
+        for name, value in changes.items():
+            setattr(query, f"_{name}", value)
+        return query
+
+    def where(self, field_path: str, op_string: str, value) -> "Query":
+        if op_string not in _OPERATORS:
+            raise ValueError(f"Unsupported operator: {op_string}")
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path: str, direction: str = ASCENDING) -> "Query":
+        return self._copy(orders=self._orders + ((field_path, direction),))
+
+    def limit(self, count: int) -> "Query":
+        return self._copy(limit=count)
+
+    def start_after(self, document_fields: dict) -> "Query":
+        return self._copy(cursor=dict(document_fields))
+
+    def select(self, field_paths) -> "Query":
+        return self._copy(projection=tuple(field_paths))
+
+    def count(self) -> SimpleNamespace:
+        def get(transaction=None):
+            matches = len(self._run())
+            self._client._count(rpcs=1, reads=1 + matches // 1000)
+            return [[SimpleNamespace(alias="count", value=matches)]]
+
+        return SimpleNamespace(get=get)
+
+    def stream(self, transaction=None):
+        docs = self._run()
+        self._client._count(rpcs=1, reads=max(1, len(docs)))
+        return iter(docs)
+
+    def get(self, transaction=None) -> list[DocumentSnapshot]:
+        return list(self.stream(transaction))
+
+    def _value(self, doc_id: str, data: dict, field_path: str):
+        if field_path == DOCUMENT_ID:
+            return doc_id
+        return _get_path(data, parse_field_path(field_path))
+
+    def _run(self) -> list[DocumentSnapshot]:
+        with self._client._lock:
+            return self._run_locked()
+
+    def _run_locked(self) -> list[DocumentSnapshot]:
+        rows = list(self._client._documents[self._collection_path].items())
+
+        for field_path, op_string, value in self._filters:
+            matches = _OPERATORS[op_string]
+            rows = [
+                (doc_id, data)
+                for doc_id, data in rows
+                if (field := self._value(doc_id, data, field_path)) is not _MISSING
+                and matches(field, value)
+            ]
+
+        # Firestore orders by document ID last, and drops documents missing
+        # an ordered field.
+        orders = list(self._orders)
+        if not any(field_path == DOCUMENT_ID for field_path, _ in orders):
+            orders.append((DOCUMENT_ID, self.ASCENDING))
+        rows = [
+            row
+            for row in rows
+            if all(self._value(*row, field) is not _MISSING for field, _ in orders)
+        ]
+        for field_path, direction in reversed(orders):
+            rows.sort(
+                key=lambda row: self._value(*row, field_path),
+                reverse=direction == self.DESCENDING,
+            )
+
+        if self._cursor is not None:
+            rows = [row for row in rows if self._after_cursor(row, orders)]
+        if self._limit is not None:
+            rows = rows[: self._limit]
+
+        collection = CollectionReference(self._client, self._collection_path)
+        return [
+            DocumentSnapshot(
+                collection.document(doc_id),
+                copy.deepcopy(
+                    data
+                    if self._projection is None
+                    else _project(data, self._projection)
+                ),
+            )
+            for doc_id, data in rows
+        ]
+
+    def _after_cursor(self, row: tuple[str, dict], orders: list) -> bool:
+        for field_path, direction in orders:
+            if field_path not in self._cursor:
+                break
+            value, bound = self._value(*row, field_path), self._cursor[field_path]
+            if value != bound:
+                return (value > bound) != (direction == self.DESCENDING)
+        return False
+
+
+class CollectionReference(Query):
+    def __init__(self, client: FakeClient, path: str) -> None:
+        super().__init__(client, path)
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    @property
+    def parent(self) -> DocumentReference | None:
+        if "/" not in self.path:
+            return None
+        parent_path, _ = self.path.rsplit("/", 1)
+        collection_path, doc_id = parent_path.rsplit("/", 1)
+        return DocumentReference(self._client, collection_path, doc_id)
+
+    def document(self, document_id: str | None = None) -> DocumentReference:
+        if document_id is None:
+            document_id = secrets.token_hex(10)
+        return DocumentReference(self._client, self.path, document_id)
+
+    def list_documents(self) -> list[DocumentReference]:
+        with self._client._lock:
+            ids = set(self._client._documents[self.path])
+            # Like show_missing=True: documents that only hold subcollections.
+            prefix = self.path + "/"
+            ids.update(
+                path[len(prefix) :]
+                for path, children in self._client._subcollections.items()
+                if children
+                and path.startswith(prefix)
+                and "/" not in path[len(prefix) :]
+            )
+        self._client._count(rpcs=1, reads=len(ids))
+        return [self.document(doc_id) for doc_id in sorted(ids)]
+
+
+class WriteBatch:
+    def __init__(self, client: FakeClient) -> None:
+        self._client = client
+        self._writes: list[tuple] = []
+
+    def create(self, reference: DocumentReference, document_data: dict) -> None:
+        self._writes.append(("create", reference, document_data, {}))
+
+    def set(self, reference, document_data: dict, merge: bool = False) -> None:
+        self._writes.append(("set", reference, document_data, {"merge": merge}))
+
+    def update(self, reference: DocumentReference, field_updates: dict) -> None:
+        self._writes.append(("update", reference, field_updates, {}))
+
+    def delete(self, reference: DocumentReference) -> None:
+        self._writes.append(("delete", reference, None, {}))
+
+    def commit(self) -> list:
+        self._client._count(rpcs=1, writes=len(self._writes))
+        with self._client._lock:
+            for operation, reference, data, options in self._writes:
+                self._client._apply(operation, reference, data, **options)
+        writes, self._writes = self._writes, []
+        return writes
+
+
+class Transaction(WriteBatch):
+    """Enough of firestore_v1.Transaction for ``transactional`` functions."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, client: FakeClient) -> None:
+        super().__init__(client)
+        self._max_attempts = 1
+        self._read_only = False
+        self._id = None
+
+    def _clean_up(self) -> None:
+        self._writes = []
+        self._id = None
+
+    def _begin(self, retry_id=None) -> None:
+        self._client._count(rpcs=1)
+        self._client._lock.acquire()
+        self._id = next(self._ids)
+
+    def _rollback(self) -> None:
+        self._clean_up()
+        self._client._lock.release()
+
+    def _commit(self) -> list:
+        try:
+            return self.commit()
+        finally:
+            self._clean_up()
+            self._client._lock.release()
+
+
+class AsyncFakeClient:
+    """A FakeClient's data behind the AsyncClient methods ``asgi.py`` calls.
+
+    Each round-trip awaits ``rpc_latency`` before running on the wrapped
+    client, and ``peak_rpcs`` records the most round-trips in flight at once,
+    so callers can tell concurrent reads from sequential ones.
+    """
+
+    def __init__(self, client: FakeClient, rpc_latency: float = 0.01) -> None:
+        self.client = client
+        self.rpc_latency = rpc_latency
+        self.in_flight = 0
+        self.peak_rpcs = 0
+
+    def collection(self, collection_id: str) -> "AsyncCollectionReference":
+        return AsyncCollectionReference(self, self.client.collection(collection_id))
+
+    async def get_all(self, references, field_paths=None, transaction=None):
+        references = [reference._reference for reference in references]
+        for snapshot in await self._rpc(self.client.get_all, references, field_paths):
+            yield snapshot
+
+    async def _rpc(self, function, *args, **kwargs):
+        self.in_flight += 1
+        self.peak_rpcs = max(self.peak_rpcs, self.in_flight)
+        try:
+            await asyncio.sleep(self.rpc_latency)
+            return function(*args, **kwargs)
+        finally:
+            self.in_flight -= 1
+
+
+class AsyncDocumentReference:
+    def __init__(self, client: AsyncFakeClient, reference: DocumentReference) -> None:
+        self._client = client
+        self._reference = reference
+        self.id = reference.id
+        self.path = reference.path
+
+    def collection(self, collection_id: str) -> "AsyncCollectionReference":
+        return AsyncCollectionReference(
+            self._client, self._reference.collection(collection_id)
+        )
+
+    async def get(self, field_paths=None, transaction=None) -> DocumentSnapshot:
+        return await self._client._rpc(self._reference.get, field_paths)
+
+
+class AsyncQuery:
+    def __init__(self, client: AsyncFakeClient, query: Query) -> None:
+        self._client = client
+        self._query = query
+
+    def where(self, field_path: str, op_string: str, value) -> "AsyncQuery":
+        return AsyncQuery(self._client, self._query.where(field_path, op_string, value))
+
+    def order_by(self, field_path: str, direction: str = Query.ASCENDING):
+        return AsyncQuery(self._client, self._query.order_by(field_path, direction))
+
+    def limit(self, count: int) -> "AsyncQuery":
+        return AsyncQuery(self._client, self._query.limit(count))
+
+    def start_after(self, document_fields: dict) -> "AsyncQuery":
+        return AsyncQuery(self._client, self._query.start_after(document_fields))
+
+    def select(self, field_paths) -> "AsyncQuery":
+        return AsyncQuery(self._client, self._query.select(field_paths))
+
+    async def stream(self, transaction=None):
+        for doc in await self._client._rpc(self._query.get):
+            yield doc
+
+    async def get(self, transaction=None) -> list[DocumentSnapshot]:
+        return await self._client._rpc(self._query.get)
+
+
+class AsyncCollectionReference(AsyncQuery):
+    def __init__(self, client: AsyncFakeClient, reference: CollectionReference):
+        super().__init__(client, reference)
+        self.id = reference.id
+        self.path = reference.path
+
+    def document(self, document_id: str | None = None) -> AsyncDocumentReference:
+        return AsyncDocumentReference(self._client, self._query.document(document_id))
@@ -0,0 +1,405 @@
+"""Load-test every gcf route against a seeded, local Firestore.
+
+Seeds a synthetic archive (thousands of exams, users with long progress and
+notification histories) into the in-memory fake from fake_firestore.py, or
+into the Firestore emulator with ``--emulator``, then drives each route of the
+single-service router (../main.py) with concurrent requests. Reports latency
+percentiles and throughput per endpoint, plus Firestore reads, writes and
+round-trips per request when running on the fake.
+
+    python bench/load_test.py [--requests N] [--concurrency N] [--exams N]
+    FIRESTORE_EMULATOR_HOST=localhost:8080 GOOGLE_CLOUD_PROJECT=demo \\
+        python bench/load_test.py --emulator
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from pathlib import Path
+
+GCF_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(GCF_DIR))
+
+import jwt  # noqa: E402
+import main as router  # noqa: E402
+from common import catalog, instrumentation  # noqa: E402
+from common.auth import SECRET_KEY  # noqa: E402
+from common.firestore import get_client, use_client  # noqa: E402
+from fake_firestore import FakeClient  # noqa: E402
+
+WRITE_BATCH = 500
+
+COMPETITIONS = {
+    "AMC8": ["AMC8"],
+    "AMC10": ["A", "B"],
+    "AMC12": ["A", "B"],
+    "AIME": ["I", "II"],
+    "USAJMO": ["USAJMO"],
+    "USAMO": ["USAMO"],
+    "HMMT": ["Feb-Algebra", "Feb-Geometry", "Feb-Combinatorics", "Nov-General"],
+    "PUMaC": ["Algebra-A", "Geometry-A", "NumberTheory-A"],
+    "Putnam": ["A", "B"],
+}
+FIRST_YEAR = 1985
+LAST_YEAR = 2024
+
+# A problem statement's worth of LaTeX-heavy prose.
+STATEMENT_WORDS = (
+    r"Let $n$ be a positive integer such that $\frac{n^2+1}{n+1}$ is an integer."
+    r" Find the number of ordered pairs $(a, b)$ with $a^2 + b^2 \equiv 0"
+    r" \pmod{p}$ where $\binom{2n}{n}$ divides $\prod_{k=1}^{n} (2k-1)$ and"
+    r" $\triangle ABC$ has circumradius $R = \sqrt{3}$."
+).split()
+
+
+@dataclass
+class Archive:
+    exams: list[tuple[str, str, str]] = field(default_factory=list)
+    users: list[str] = field(default_factory=list)
+    notification_ids: dict[str, list[str]] = field(default_factory=dict)
+
+
+def exam_keys(count: int) -> list[tuple[str, str, str]]:
+    """``count`` exams spread over competitions, newest years first.
+
+    Past the real competitions, numbered regional contests fill the archive.
+    """
+    years = [str(year) for year in range(LAST_YEAR, FIRST_YEAR - 1, -1)]
+    competitions = list(COMPETITIONS.items())
+    regionals = (
+        (f"Regional{number:03d}", ["Individual", "Team"]) for number in range(1, 1000)
+    )
+    keys = []
+    for competition, exams in competitions + list(regionals):
+        for year in years:
+            for exam in exams:
+                keys.append((competition, year, exam))
+                if len(keys) == count:
+                    return keys
+    return keys
+
+
+def statement(rng: random.Random) -> str:
+    return " ".join(rng.choices(STATEMENT_WORDS, k=rng.randint(60, 160)))
+
+
+def archive_writes(
+    rng: random.Random,
+    archive: Archive,
+    db,
+    exams: int,
+    problems: int,
+    users: int,
+    progress: int,
+    notifications: int,
+) -> Iterable[tuple]:
+    """Yield (document reference, data) for the whole synthetic archive."""
+    for competition, year, exam in exam_keys(exams):
+        archive.exams.append((competition, year, exam))
+        exam_ref = db.collection(competition).document(year).collection(exam)
+        yield exam_ref.document("Info"), {"private": rng.random() < 0.05}
+        yield exam_ref.document("Comment"), {"comment": statement(rng)[:200]}
+        problems_ref = exam_ref.document("Problems").collection("Problems")
+        for number in range(1, problems + 1):
+            problem = {
+                "number": number,
+                "label": f"Problem {number}",
+                "statement": statement(rng),
+                "answer": str(rng.randint(0, 999)),
+            }
+            if rng.random() < 0.3:
+                problem["images"] = [
+                    {
+                        "url": f"https://example.com/{competition}/{year}/{number}.png",
+                        "width": rng.randint(200, 800),
+                        "height": rng.randint(150, 600),
+                        "alt": statement(rng)[:80],
+                    }
+                ]
+            yield problems_ref.document(f"{number:03d}"), problem
+
+    now = datetime.now(timezone.utc)
+    for index in range(users):
+        user_id = f"user{index:06d}"
+        archive.users.append(user_id)
+        user_ref = db.collection("users").document(user_id)
+        created_at = now - timedelta(days=rng.randint(30, 2000))
+        yield user_ref, {
+            "name": f"Student {index}",
+            "email": f"student{index}@example.com",
+            "avatar": f"https://example.com/avatars/{index}.png",
+            "isAdmin": False,
+            "isStaff": rng.random() < 0.01,
+            "createdAt": created_at.isoformat(),
+            "lastLogin": now.isoformat(),
+            "points": rng.randint(0, 50000),
+            "role": "student",
+        }
+        for competition, year, exam in rng.sample(
+            archive.exams, min(progress, len(archive.exams))
+        ):
+            completed_at = created_at + timedelta(minutes=rng.randint(0, 10**6))
+            yield user_ref.collection("progress").document(
+                f"{competition}-{year}-{exam}"
+            ), {
+                "testId": f"{competition}/{year}/{exam}",
+                "score": rng.randint(0, 150),
+                "completedAt": completed_at.isoformat(),
+            }
+        ids = archive.notification_ids.setdefault(user_id, [])
+        for number in range(notifications):
+            ids.append(f"n{number:05d}")
+            yield user_ref.collection("notifications").document(ids[-1]), {
+                "message": statement(rng)[:120],
+                "timestamp": now - timedelta(hours=number),
+                "read": rng.random() < 0.7,
+            }
+
+
+def seed(db, writes: Iterable[tuple]) -> int:
+    """Write everything in batches, returning the document count."""
+    writes = iter(writes)
+    total = 0
+    while chunk := list(islice(writes, WRITE_BATCH)):
+        batch = db.batch()
+        for ref, data in chunk:
+            batch.set(ref, data)
+        batch.commit()
+        total += len(chunk)
+    return total
+
+
+def token_for(user_id: str, hours: int = 2) -> str:
+    exp = datetime.now(timezone.utc) + timedelta(hours=hours)
+    claims = {"user_id": user_id, "exp": exp, "jti": uuid.uuid4().hex}
+    return jwt.encode(claims, SECRET_KEY, algorithm="HS256")
+
+
+@dataclass
+class Endpoint:
+    name: str
+    method: str
+    path: str
+    # (rng, archive, tokens) -> keyword arguments for the Flask test client
+    make: Callable[[random.Random, Archive, dict], dict]
+
+
+def _auth(tokens: dict, user_id: str) -> dict:
+    return {"Authorization": f"Bearer {tokens[user_id]}"}
+
+
+def _exam_query(rng: random.Random, archive: Archive) -> dict:
+    competition, year, exam = rng.choice(archive.exams)
+    return {"competition": competition, "year": year, "exam": exam}
+
+
+def _as_user(rng: random.Random, archive: Archive, tokens: dict) -> dict:
+    return {"headers": _auth(tokens, rng.choice(archive.users))}
+
+
+def _as_user_ndjson(rng: random.Random, archive: Archive, tokens: dict) -> dict:
+    headers = _auth(tokens, rng.choice(archive.users))
+    return {"headers": {**headers, "Accept": "application/x-ndjson"}}
+
+
+def _mark_one(rng: random.Random, archive: Archive, tokens: dict) -> dict:
+    user_id = rng.choice(archive.users)
+    return {
+        "headers": _auth(tokens, user_id),
+        "json": {"notification_id": rng.choice(archive.notification_ids[user_id])},
+    }
+
+
+def _mark_many(rng: random.Random, archive: Archive, tokens: dict) -> dict:
+    user_id = rng.choice(archive.users)
+    ids = archive.notification_ids[user_id]
+    return {
+        "headers": _auth(tokens, user_id),
+        "json": {"notification_ids": rng.sample(ids, min(5, len(ids)))},
+    }
+
+
+def _logout(rng: random.Random, archive: Archive, tokens: dict) -> dict:
+    # A fresh token per request, so logging out does not lock other calls out.
+    user_id = rng.choice(archive.users)
+    return {"headers": {"Authorization": f"Bearer {token_for(user_id)}"}}
+
+
+ENDPOINTS = [
+    Endpoint("list_exams", "GET", "/exams", lambda rng, archive, tokens: {}),
+    Endpoint(
+        "get_exam_data",
+        "GET",
+        "/exam-data",
+        lambda rng, archive, tokens: {"query_string": _exam_query(rng, archive)},
+    ),
+    Endpoint(
+        "get_exam_data fields",
+        "GET",
+        "/exam-data",
+        lambda rng, archive, tokens: {
+            "query_string": {**_exam_query(rng, archive), "fields": "number,label"}
+        },
+    ),
+    Endpoint("get_user_info", "GET", "/user", _as_user),
+    Endpoint("user_progress", "GET", "/user-progress", _as_user),
+    Endpoint("user_progress ndjson", "GET", "/user-progress", _as_user_ndjson),
+    Endpoint("user_notifications", "GET", "/notifications", _as_user),
+    Endpoint(
+        "unread_notification_count", "GET", "/notifications/unread-count", _as_user
+    ),
+    Endpoint("session_bootstrap", "GET", "/bootstrap", _as_user),
+    Endpoint("mark_notification_read", "POST", "/update-notification", _mark_one),
+    Endpoint(
+        "mark_notifications_read", "POST", "/update-notification/batch", _mark_many
+    ),
+    Endpoint("logout", "POST", "/logout", _logout),
+]
+
+
+def percentile(samples: list[float], pct: int) -> float:
+    if len(samples) < 2:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[pct - 1]
+
+
+def run_endpoint(
+    endpoint: Endpoint,
+    archive: Archive,
+    tokens: dict,
+    rng: random.Random,
+    requests: int,
+    concurrency: int,
+    db,
+) -> dict:
+    calls = [endpoint.make(rng, archive, tokens) for _ in range(requests)]
+    local = threading.local()
+
+    def call(kwargs: dict) -> tuple[float, int]:
+        if not hasattr(local, "client"):
+            local.client = router.app.test_client()
+        headers = {"Accept-Encoding": "br, gzip", **kwargs.pop("headers", {})}
+        started = time.perf_counter()
+        response = local.client.open(
+            endpoint.path, method=endpoint.method, headers=headers, **kwargs
+        )
+        response.get_data()
+        return time.perf_counter() - started, response.status_code
+
+    if isinstance(db, FakeClient):
+        db.reset_stats()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(call, calls))
+    wall = time.perf_counter() - started
+    stats = db.reset_stats() if isinstance(db, FakeClient) else None
+
+    latencies = sorted(elapsed * 1000 for elapsed, _ in results)
+    return {
+        "errors": sum(status not in (200, 204, 304) for _, status in results),
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "throughput": requests / wall,
+        "per_request": (
+            {key: stats[key] / requests for key in ("reads", "writes", "rpcs")}
+            if stats is not None
+            else None
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="gcf load test")
+    parser.add_argument("--requests", type=int, default=200, help="per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--exams", type=int, default=2000)
+    parser.add_argument("--problems", type=int, default=15, help="per exam")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--progress", type=int, default=200, help="per user")
+    parser.add_argument("--notifications", type=int, default=30, help="per user")
+    parser.add_argument(
+        "--rpc-latency-ms",
+        type=float,
+        default=0.0,
+        help="simulated network delay per Firestore round-trip (fake only)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument(
+        "--emulator",
+        action="store_true",
+        help="use the Firestore emulator at FIRESTORE_EMULATOR_HOST",
+    )
+    parser.add_argument(
+        "--only", nargs="*", metavar="ENDPOINT", help="endpoint names to run"
+    )
+    args = parser.parse_args()
+
+    # One usage log line per request would drown the report.
+    instrumentation.LOG_USAGE = False
+    if args.emulator:
+        if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+            parser.error("--emulator needs FIRESTORE_EMULATOR_HOST")
+        db = get_client()
+    else:
+        db = FakeClient(rpc_latency=args.rpc_latency_ms / 1000)
+        use_client(db)
+
+    rng = random.Random(args.seed)
+    archive = Archive()
+    started = time.perf_counter()
+    documents = seed(
+        db,
+        archive_writes(
+            rng,
+            archive,
+            db,
+            args.exams,
+            args.problems,
+            args.users,
+            args.progress,
+            args.notifications,
+        ),
+    )
+    # Production keeps the catalog current with the exam-catalog trigger.
+    catalog.rebuild_catalog(db)
+    print(f"Seeded {documents} documents in {time.perf_counter() - started:.1f}s")
+
+    tokens = {user_id: token_for(user_id) for user_id in archive.users}
+    endpoints = [e for e in ENDPOINTS if not args.only or e.name in args.only]
+
+    print(
+        f"{'Endpoint':<28} | {'Errors':>6} | {'p50 ms':>7} | {'p95 ms':>7} | "
+        f"{'p99 ms':>7} | {'Req/s':>7} | {'Reads':>6} | {'Writes':>6} | {'RPCs':>5}"
+    )
+    print("-" * 104)
+    for endpoint in endpoints:
+        result = run_endpoint(
+            endpoint, archive, tokens, rng, args.requests, args.concurrency, db
+        )
+        per_request = result["per_request"]
+        costs = (
+            f"{per_request['reads']:>6.1f} | {per_request['writes']:>6.1f} | "
+            f"{per_request['rpcs']:>5.1f}"
+            if per_request is not None
+            else f"{'-':>6} | {'-':>6} | {'-':>5}"
+        )
+        print(
+            f"{endpoint.name:<28} | {result['errors']:>6} | {result['p50']:>7.2f} | "
+            f"{result['p95']:>7.2f} | {result['p99']:>7.2f} | "
+            f"{result['throughput']:>7.1f} | {costs}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Bearer-token authentication shared by the gcf handlers."""
+
+import functools
+import time
+from collections.abc import Callable
+
+from flask import Request, Response, jsonify
+
+from common.cache import TTLCache
+from common.firestore import get_client
+from common.revocation import revocations
+
+SECRET_KEY = (
+    "a_secure_random_secret_key"  # Use the same secret key as in the login function
+)
+
+# Verified claims per token, kept until the token's own expiry so chatty
+# clients skip the HMAC check on every call.
+token_cache = TTLCache(maxsize=1024, ttl=300)
+
+
+def bearer_token(request: Request) -> str | None:
+    auth_header = request.headers.get("Authorization")
+    if not auth_header:
+        return None
+    parts = auth_header.split(" ")
+    return parts[1] if len(parts) > 1 else ""
+
+
+def verify_token(token: str) -> dict:
+    """Decode ``token``, raising jwt.InvalidTokenError subclasses on failure."""
+    import jwt
+
+    claims = token_cache.get(token)
+    if claims is not None:
+        return claims
+
+    claims = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+    if "exp" in claims:
+        token_cache.set(token, claims, ttl=claims["exp"] - time.time())
+    return claims
+
+
+class AuthError(Exception):
+    """The client-facing reason a request failed authentication."""
+
+
+def authenticate(token: str | None) -> str:
+    """Return the user_id for ``token`` or raise AuthError."""
+    import jwt
+
+    if token is None:
+        raise AuthError("Authorization header missing")
+
+    try:
+        user_id = verify_token(token)["user_id"]
+    except jwt.ExpiredSignatureError as err:
+        raise AuthError("Token has expired") from err
+    except (jwt.InvalidTokenError, KeyError) as err:
+        raise AuthError("Invalid token") from err
+
+    if revocations.is_revoked(get_client(), token):
+        raise AuthError("Token has been revoked")
+
+    return user_id
+
+
+def revoke_token(token: str) -> None:
+    """Stop accepting ``token`` on this instance immediately."""
+    token_cache.invalidate(token)
+    revocations.revoke_locally(token)
+
+
+def require_auth(
+    headers: dict,
+) -> Callable[[Callable[[Request, str], Response]], Callable[[Request], Response]]:
+    """Verify the request's JWT and call ``handler(request, user_id)``.
+
+    Tokens listed in ``token_blacklist`` by logout are rejected.
+    Preflight OPTIONS requests are answered with ``headers`` and no auth.
+    """
+
+    def decorator(
+        handler: Callable[[Request, str], Response],
+    ) -> Callable[[Request], Response]:
+        @functools.wraps(handler)
+        def wrapper(request: Request) -> Response:
+            if request.method == "OPTIONS":
+                return Response(status=204, headers=headers)
+
+            try:
+                user_id = authenticate(bearer_token(request))
+            except AuthError as e:
+                return jsonify({"error": str(e)}), 401, headers
+            except Exception as e:
+                # E.g. Firestore failing to confirm a revocation-filter hit.
+                return jsonify({"error": str(e)}), 500, headers
+
+            return handler(request, user_id)
+
+        return wrapper
+
+    return decorator
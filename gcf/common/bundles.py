@@ -0,0 +1,131 @@
+"""Pre-serialized, pre-compressed exam payloads kept in a blob store.
+
+A publish step renders an exam once and writes one object per content
+encoding; the serving path then returns those bytes unchanged without
+touching Firestore.
+"""
+
+import os
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from common.compression import available_encodings, compress
+
+EXTENSIONS = {"gzip": "gz", "br": "br"}
+
+
+def check_segment(value: str) -> str:
+    """Reject values that would step outside their place in a path."""
+    if not value or value in (".", "..") or "/" in value or "\\" in value:
+        raise ValueError(f"Invalid path segment: {value!r}")
+    return value
+
+
+def bundle_name(competition: str, year: str, exam: str, encoding: str) -> str:
+    for segment in (competition, year, exam):
+        check_segment(segment)
+    return f"{competition}/{year}/{exam}.json.{EXTENSIONS[encoding]}"
+
+
+class BundleStore(ABC):
+    @abstractmethod
+    def read(self, name: str) -> bytes | None:
+        pass
+
+    @abstractmethod
+    def write(self, name: str, data: bytes, content_encoding: str) -> None:
+        pass
+
+
+class LocalBundleStore(BundleStore):
+    """Directory-backed store, used for local testing."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = Path(directory).resolve()
+
+    def _path(self, name: str) -> Path:
+        path = (self.directory / name).resolve()
+        if not path.is_relative_to(self.directory):
+            raise ValueError(f"Bundle name escapes the store: {name!r}")
+        return path
+
+    def read(self, name: str) -> bytes | None:
+        try:
+            return self._path(name).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def write(self, name: str, data: bytes, content_encoding: str) -> None:
+        path = self._path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+
+class GCSBundleStore(BundleStore):
+    """Cloud Storage-backed store; requires google-cloud-storage."""
+
+    def __init__(self, bucket_name: str) -> None:
+        from google.cloud import storage
+
+        self.bucket = storage.Client().bucket(bucket_name)
+
+    def read(self, name: str) -> bytes | None:
+        from google.api_core.exceptions import NotFound
+
+        try:
+            # raw_download keeps the stored bytes compressed.
+            return self.bucket.blob(name).download_as_bytes(raw_download=True)
+        except NotFound:
+            return None
+
+    def write(self, name: str, data: bytes, content_encoding: str) -> None:
+        blob = self.bucket.blob(name)
+        blob.content_encoding = content_encoding
+        blob.upload_from_string(data, content_type="application/json")
+
+
+def bundle_store_from_env() -> BundleStore | None:
+    """Pick a store from EXAM_BUNDLE_BUCKET or EXAM_BUNDLE_DIR, if either is set."""
+    if bucket_name := os.getenv("EXAM_BUNDLE_BUCKET"):
+        return GCSBundleStore(bucket_name)
+    if directory := os.getenv("EXAM_BUNDLE_DIR"):
+        return LocalBundleStore(directory)
+    return None
+
+
+_store: BundleStore | None = None
+_store_loaded = False
+_store_lock = threading.Lock()
+
+
+def get_bundle_store() -> BundleStore | None:
+    """The store picked by bundle_store_from_env, created on first use."""
+    global _store, _store_loaded
+    if not _store_loaded:
+        with _store_lock:
+            if not _store_loaded:
+                _store = bundle_store_from_env()
+                _store_loaded = True
+    return _store
+
+
+def use_bundle_store(store: BundleStore | None) -> None:
+    """Make ``store`` the process-wide store, e.g. a local one for tests."""
+    global _store, _store_loaded
+    with _store_lock:
+        _store, _store_loaded = store, True
+
+
+def publish_bundle(
+    store: BundleStore, competition: str, year: str, exam: str, body: bytes
+) -> None:
+    """Write ``body`` once per available encoding."""
+    for encoding in available_encodings():
+        store.write(
+            bundle_name(competition, year, exam, encoding),
+            compress(body, encoding, best=True),
+            encoding,
+        )
@@ -0,0 +1,205 @@
+"""Materialized index of the competition/year/exam tree.
+
+Exams live at ``{competition}/{year}/{exam}`` with an optional ``Info``
+document carrying the ``private`` flag. Walking that tree costs one read per
+exam, so the catalog keeps one row per exam in a fixed set of shard
+documents and listing exams becomes a single ``get_all`` of CATALOG_SHARDS
+reads, however large the archive grows. Sharding keeps each document well
+under Firestore's 1 MiB limit; the ``exams`` map is exempted from indexing
+(see terraform/main.tf), so rows add no index entries.
+"""
+
+from __future__ import annotations
+
+import zlib
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+from common import firestore
+from common.instrumentation import ContextThreadPoolExecutor
+
+if TYPE_CHECKING:
+    from google.cloud import firestore_v1
+
+CATALOG_COLLECTION = "catalog"
+CATALOG_DOCUMENT = "exams"
+# Changing this needs a rebuild_catalog; rows would be looked up in the
+# wrong shard otherwise.
+CATALOG_SHARDS = 8
+
+# Root collections that hold app data rather than competitions.
+NON_EXAM_COLLECTIONS = {CATALOG_COLLECTION, "token_blacklist", "users"}
+
+
+def catalog_key(competition: str, year: str, exam: str) -> str:
+    return f"{competition}/{year}/{exam}"
+
+
+def catalog_row(competition: str, year: str, exam: str, private: bool) -> dict:
+    return {
+        "competition": competition,
+        "year": year,
+        "exam": exam,
+        "private": private,
+    }
+
+
+def scan_exams(db: firestore_v1.Client, max_workers: int = 8) -> list[dict]:
+    """Walk the exam tree and return a catalog row for every exam.
+
+    Years and exams are listed in parallel and all ``Info`` documents are
+    fetched in one batch, so latency grows with tree depth rather than with
+    the number of exams.
+    """
+    competitions = [
+        competition
+        for competition in db.collections()
+        if competition.id not in NON_EXAM_COLLECTIONS
+    ]
+    with ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+        years = [
+            year
+            for competition_years in executor.map(
+                lambda competition: list(competition.list_documents()), competitions
+            )
+            for year in competition_years
+        ]
+        exams = [
+            exam
+            for year_exams in executor.map(lambda year: list(year.collections()), years)
+            for exam in year_exams
+        ]
+
+    info_refs = [exam.document("Info") for exam in exams]
+    private_by_path = {
+        info_doc.reference.path: bool(info_doc.to_dict().get("private", False))
+        for info_doc in (db.get_all(info_refs) if info_refs else [])
+        if info_doc.exists
+    }
+
+    return [
+        catalog_row(
+            exam.parent.parent.id,
+            exam.parent.id,
+            exam.id,
+            private_by_path.get(info_ref.path, False),
+        )
+        for exam, info_ref in zip(exams, info_refs)
+    ]
+
+
+def shard_for(key: str) -> int:
+    # Stable across processes, unlike hash().
+    return zlib.crc32(key.encode("utf-8")) % CATALOG_SHARDS
+
+
+def catalog_refs(db: firestore_v1.Client) -> list[firestore_v1.DocumentReference]:
+    return [shard_ref(db, shard) for shard in range(CATALOG_SHARDS)]
+
+
+def shard_ref(db: firestore_v1.Client, shard: int) -> firestore_v1.DocumentReference:
+    return db.collection(CATALOG_COLLECTION).document(f"{CATALOG_DOCUMENT}-{shard}")
+
+
+def load_catalog(db: firestore_v1.Client) -> list[dict] | None:
+    """Return the catalog rows, or None if the catalog has never been built."""
+    return catalog_rows(db.get_all(catalog_refs(db)))
+
+
+def catalog_rows(
+    shard_docs: Iterable[firestore_v1.DocumentSnapshot],
+) -> list[dict] | None:
+    """Rows from the fetched catalog shards, or None if any does not exist."""
+    rows = []
+    for shard_doc in shard_docs:
+        if not shard_doc.exists:
+            return None
+        rows.extend((shard_doc.to_dict().get("exams") or {}).values())
+    return rows
+
+
+def rebuild_catalog(db: firestore_v1.Client) -> list[dict]:
+    """Rebuild the catalog from a full scan of the exam tree."""
+    rows = scan_exams(db)
+    shards = [{} for _ in range(CATALOG_SHARDS)]
+    for row in rows:
+        key = catalog_key(row["competition"], row["year"], row["exam"])
+        shards[shard_for(key)][key] = row
+    # One batch, so readers never see a partly rebuilt catalog.
+    batch = db.batch()
+    for ref, exams in zip(catalog_refs(db), shards):
+        batch.set(ref, {"exams": exams, "updated_at": firestore.SERVER_TIMESTAMP})
+    batch.commit()
+    return rows
+
+
+def _update_row(
+    db: firestore_v1.Client, competition: str, year: str, exam: str, value
+) -> None:
+    key = catalog_key(competition, year, exam)
+    shard_ref(db, shard_for(key)).update(
+        {
+            firestore.FieldPath("exams", key).to_api_repr(): value,
+            "updated_at": firestore.SERVER_TIMESTAMP,
+        }
+    )
+
+
+def upsert_exam(
+    db: firestore_v1.Client,
+    competition: str,
+    year: str,
+    exam: str,
+    private: bool = False,
+) -> None:
+    """Add or replace the catalog row for a single exam.
+
+    Raises NotFound if the catalog was never built: creating it with one row
+    would hide every other exam.
+    """
+    _update_row(
+        db, competition, year, exam, catalog_row(competition, year, exam, private)
+    )
+
+
+def remove_exam(
+    db: firestore_v1.Client, competition: str, year: str, exam: str
+) -> None:
+    """Drop the catalog row for a single exam; raises NotFound like upsert_exam."""
+    _update_row(db, competition, year, exam, firestore.DELETE_FIELD)
+
+
+def sync_exam(
+    db: firestore_v1.Client,
+    competition: str,
+    year: str,
+    exam: str,
+    info: dict | None,
+) -> None:
+    """Update the catalog after a write to an exam's ``Info`` document.
+
+    ``info`` is the new document, or None if it was deleted. Without Info the
+    exam stays listed (as public) only while other documents remain under it.
+    A catalog that was never built is built in full instead.
+    """
+    try:
+        if info is None:
+            exam_ref = db.collection(competition).document(year).collection(exam)
+            if not list(exam_ref.limit(1).stream()):
+                remove_exam(db, competition, year, exam)
+                return
+        private = bool((info or {}).get("private", False))
+        upsert_exam(db, competition, year, exam, private)
+    except firestore.NotFound:
+        rebuild_catalog(db)
+
+
+def public_exams(rows: list[dict]) -> list[dict]:
+    """Strip private exams and return rows in tree order."""
+    return [
+        {"competition": row["competition"], "year": row["year"], "exam": row["exam"]}
+        for row in sorted(
+            rows, key=lambda row: (row["competition"], row["year"], row["exam"])
+        )
+        if not row.get("private", False)
+    ]
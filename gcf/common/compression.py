@@ -0,0 +1,70 @@
+"""Content-Encoding negotiation and compression for JSON responses.
+
+Bodies under ``MIN_SIZE`` are sent as-is: below roughly a packet, compressing
+saves nothing on the wire and costs CPU on both ends.
+"""
+
+import functools
+import gzip
+from collections.abc import Callable
+
+from flask import Request, Response, make_response
+from werkzeug.datastructures import Accept
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available.
+    brotli = None
+
+MIN_SIZE = 1024
+
+
+def available_encodings() -> list[str]:
+    """Encodings we can produce, in order of preference."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def compress(body: bytes, encoding: str, best: bool = False) -> bytes:
+    """Compress ``body``; ``best`` trades speed for size, for one-off publishing."""
+    if encoding == "br":
+        return brotli.compress(body, quality=11 if best else 5)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=9 if best else 6, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def negotiate_encoding(accept_encodings: Accept) -> str | None:
+    """The preferred encoding the client accepts, or None for identity."""
+    return accept_encodings.best_match(available_encodings())
+
+
+def compress_response(request: Request, response: Response) -> Response:
+    """Compress a buffered response in place if it is large enough to benefit."""
+    if (
+        response.status_code != 200
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+    body = response.get_data()
+    if len(body) < MIN_SIZE:
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = negotiate_encoding(request.accept_encodings)
+    if encoding is not None:
+        response.set_data(compress(body, encoding))
+        response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def compressed(handler: Callable[..., Response]) -> Callable[..., Response]:
+    """Compress the responses of a ``handler(request, ...)``."""
+
+    @functools.wraps(handler)
+    def wrapper(request: Request, *args, **kwargs) -> Response:
+        return compress_response(
+            request, make_response(handler(request, *args, **kwargs))
+        )
+
+    return wrapper
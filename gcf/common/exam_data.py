@@ -0,0 +1,98 @@
+"""Exam payloads and their caches, shared by the Flask functions and asgi.py.
+
+Exams change rarely, so serialized payloads are kept for the lifetime of a
+warm instance and revalidated by browsers/CDNs via ETag. Both servers read
+and fill the same caches, so they always serve the same bytes.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from common import catalog
+from common.bundles import BundleStore, bundle_name
+from common.cache import TTLCache
+from common.compression import negotiate_encoding
+from common.responses import (
+    CachedPayload,
+    cached_json_response,
+    payload_from_bytes,
+    serialize_payload,
+)
+from flask import Request, Response
+
+if TYPE_CHECKING:
+    from google.cloud import firestore_v1
+
+CACHE_MAX_AGE = 300
+EXAMS_CACHE_KEY = "tests"
+
+# Payloads per (competition, year, exam, fields), and bundles per
+# (competition, year, exam, encoding).
+exam_cache = TTLCache(maxsize=256, ttl=CACHE_MAX_AGE)
+exams_cache = TTLCache(maxsize=1, ttl=CACHE_MAX_AGE)
+
+
+def cache_public_exams(rows: list[dict]) -> CachedPayload:
+    """Serialize the public exam list from catalog ``rows`` and cache it."""
+    cached = serialize_payload({"tests": catalog.public_exams(rows)})
+    exams_cache.set(EXAMS_CACHE_KEY, cached)
+    return cached
+
+
+def problems_query(
+    exam_ref: firestore_v1.CollectionReference, fields: tuple[str, ...] | None
+) -> firestore_v1.Query:
+    query = exam_ref.document("Problems").collection("Problems").order_by("number")
+    if fields is not None:
+        query = query.select(fields)
+    return query
+
+
+def exam_payload(
+    competition: str,
+    year: str,
+    exam: str,
+    problems: list[firestore_v1.DocumentSnapshot],
+    comment_doc: firestore_v1.DocumentSnapshot,
+) -> dict:
+    return {
+        "problems": [{"problem_id": doc.id, **doc.to_dict()} for doc in problems],
+        "comment": (
+            comment_doc.to_dict().get("comment", "") if comment_doc.exists else ""
+        ),
+        "competition": competition,
+        "year": year,
+        "exam": exam,
+    }
+
+
+def bundle_response(
+    request: Request,
+    bundle_store: BundleStore,
+    competition: str,
+    year: str,
+    exam: str,
+    headers: dict,
+) -> Response | None:
+    """Serve a published, pre-compressed bundle, or None to fall back."""
+    encoding = negotiate_encoding(request.accept_encodings)
+    if encoding is None:
+        return None
+
+    cache_key = (competition, year, exam, encoding)
+    cached = exam_cache.get(cache_key)
+    if cached is None:
+        bundle = bundle_store.read(bundle_name(competition, year, exam, encoding))
+        # Remember misses too (as False) so unpublished exams skip the store.
+        cached = payload_from_bytes(bundle) if bundle is not None else False
+        exam_cache.set(cache_key, cached)
+    if not cached:
+        return None
+
+    bundle_headers = {
+        **headers,
+        "Content-Encoding": encoding,
+        "Vary": "Accept-Encoding",
+    }
+    return cached_json_response(request, cached, bundle_headers, CACHE_MAX_AGE)
@@ -0,0 +1,112 @@
+"""Process-wide, lazily constructed Firestore client.
+
+Importing google.cloud.firestore_v1 and building a client are the bulk of a
+cold start, so neither happens until a request actually needs Firestore.
+Preflight and rejected requests never pay for them.
+
+The sentinels, helpers and exceptions other modules need from the client
+library are attributes of this module, imported on first access. Use them as
+``firestore.SERVER_TIMESTAMP`` after ``from common import firestore`` rather
+than importing google.cloud.firestore_v1 at module level.
+"""
+
+from __future__ import annotations
+
+import importlib
+import threading
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+from common.instrumentation import instrument
+
+if TYPE_CHECKING:
+    from google.cloud import firestore_v1
+
+DATABASE = "grindolympiads"
+
+_client: firestore_v1.Client | None = None
+_async_client: firestore_v1.AsyncClient | None = None
+_client_lock = threading.Lock()
+_thread_local = threading.local()
+
+_LAZY_NAMES = {
+    "SERVER_TIMESTAMP": "google.cloud.firestore_v1",
+    "DELETE_FIELD": "google.cloud.firestore_v1",
+    "Increment": "google.cloud.firestore_v1",
+    "transactional": "google.cloud.firestore_v1",
+    "FieldPath": "google.cloud.firestore_v1.field_path",
+    "AlreadyExists": "google.api_core.exceptions",
+    "NotFound": "google.api_core.exceptions",
+}
+
+
+def _import_lazy(name: str) -> Any:
+    value = getattr(importlib.import_module(_LAZY_NAMES[name]), name)
+    # Later lookups find the module global and skip __getattr__.
+    globals()[name] = value
+    return value
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return _import_lazy(name)
+
+
+def get_client() -> firestore_v1.Client:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from google.cloud import firestore_v1
+
+                _client = instrument(firestore_v1.Client(database=DATABASE))
+    return _client
+
+
+def use_client(client: firestore_v1.Client) -> None:
+    """Make ``client`` the process-wide client, e.g. a local stand-in for benchmarks."""
+    global _client
+    with _client_lock:
+        _client = client
+
+
+def get_async_client() -> firestore_v1.AsyncClient:
+    """Like get_client, for handlers running on an asyncio event loop.
+
+    Call it from the loop that will use the client; its gRPC channel is tied
+    to that loop. Its RPCs are not counted by common.instrumentation.
+    """
+    global _async_client
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                from google.cloud import firestore_v1
+
+                _async_client = firestore_v1.AsyncClient(database=DATABASE)
+    return _async_client
+
+
+def use_async_client(client: firestore_v1.AsyncClient) -> None:
+    """Like use_client, for get_async_client."""
+    global _async_client
+    with _client_lock:
+        _async_client = client
+
+
+def run_in_transaction(
+    function: Callable[..., Any], db: firestore_v1.Client, *args: Any
+) -> Any:
+    """Call ``function(transaction, db, *args)`` in a transaction, with retries.
+
+    Each function is wrapped with ``transactional`` once per thread: the
+    wrapper keeps the running attempt's IDs on itself, so concurrent requests
+    cannot share one.
+    """
+    wrappers = getattr(_thread_local, "transactional", None)
+    if wrappers is None:
+        wrappers = _thread_local.transactional = {}
+    wrapped = wrappers.get(function)
+    if wrapped is None:
+        wrapped = wrappers[function] = _import_lazy("transactional")(function)
+    return wrapped(db.transaction(), db, *args)
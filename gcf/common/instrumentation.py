@@ -0,0 +1,296 @@
+"""Per-request Firestore usage: document reads, writes, round-trips and time.
+
+``instrument`` wraps a client's GAPIC layer, so every RPC made through
+references, queries, batches and transactions is seen exactly once along with
+the documents it returned or wrote. ``instrumented`` collects those numbers for
+one handler call and reports them in a Server-Timing header and a structured
+log line.
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from flask import Request, Response, make_response
+
+# Set FIRESTORE_USAGE_LOG=0 to keep Server-Timing but drop the log lines.
+LOG_USAGE = os.getenv("FIRESTORE_USAGE_LOG", "1") != "0"
+
+
+class StructuredFormatter(logging.Formatter):
+    """One JSON object per record, which Cloud Logging parses into fields.
+
+    Pass extra fields as ``extra={"fields": {...}}``.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(
+            {
+                "severity": record.levelname,
+                "message": record.getMessage(),
+                **getattr(record, "fields", {}),
+            }
+        )
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+_handler = logging.StreamHandler(sys.stdout)
+_handler.setFormatter(StructuredFormatter())
+logger.addHandler(_handler)
+# Usage lines are already structured; the root logger would wrap them again.
+logger.propagate = False
+
+
+@dataclass
+class FirestoreUsage:
+    reads: int = 0
+    writes: int = 0
+    rpcs: int = 0
+    # Summed over calls, so concurrent calls can add up to more than wall time.
+    seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, reads: int = 0, writes: int = 0, rpcs: int = 0, seconds=0.0):
+        with self._lock:
+            self.reads += reads
+            self.writes += writes
+            self.rpcs += rpcs
+            self.seconds += seconds
+
+
+_usage: contextvars.ContextVar[FirestoreUsage | None] = contextvars.ContextVar(
+    "firestore_usage", default=None
+)
+
+
+def record(reads: int = 0, writes: int = 0, rpcs: int = 0, seconds=0.0) -> None:
+    """Add to the current request's usage, for clients not built by get_client."""
+    usage = _usage.get()
+    if usage is not None:
+        usage.add(reads=reads, writes=writes, rpcs=rpcs, seconds=seconds)
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """A thread pool whose tasks count towards the submitting request."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        context = contextvars.copy_context()
+        return super().submit(context.run, fn, *args, **kwargs)
+
+
+def _request_field(request, name: str):
+    return (
+        request.get(name, ()) if isinstance(request, dict) else getattr(request, name)
+    )
+
+
+def _is_document(response) -> bool:
+    """True for run_query responses that carry a result document."""
+    return "document" in response
+
+
+def _is_lookup(response) -> bool:
+    """True for batch_get_documents responses; missing documents are billed too."""
+    return "found" in response or "missing" in response
+
+
+# GAPIC method -> (counts one read per item, minimum reads per call)
+_STREAMS = {
+    "run_query": (_is_document, 1),
+    "batch_get_documents": (_is_lookup, 0),
+    "run_aggregation_query": (lambda response: False, 1),
+}
+# Paged GAPIC method -> reads billed per page. Each page is its own round-trip.
+_PAGED = {
+    "list_documents": lambda page: len(page.documents),
+    "list_collection_ids": lambda page: 1,
+}
+_WRITES = {"commit", "batch_write"}
+_RPCS = {"begin_transaction", "rollback"}
+_COUNTED = {*_STREAMS, *_PAGED, *_WRITES, *_RPCS}
+
+
+def _count_stream(
+    items: Iterable, usage: FirestoreUsage, started: float, is_read, minimum: int
+) -> Iterator:
+    reads = 0
+    try:
+        for item in items:
+            if is_read(item):
+                reads += 1
+            yield item
+    finally:
+        usage.add(
+            reads=max(reads, minimum),
+            rpcs=1,
+            seconds=time.perf_counter() - started,
+        )
+
+
+def _count_page(fetch: Callable, usage: FirestoreUsage, reads_in) -> Callable:
+    """Wrap one page fetch of a paged method to account it as a round-trip."""
+
+    @functools.wraps(fetch)
+    def fetch_page(*args, **kwargs):
+        started = time.perf_counter()
+        page = None
+        try:
+            page = fetch(*args, **kwargs)
+            return page
+        finally:
+            usage.add(
+                reads=reads_in(page) if page is not None else 0,
+                rpcs=1,
+                seconds=time.perf_counter() - started,
+            )
+
+    return fetch_page
+
+
+class _InstrumentedApi:
+    """Proxy for a GAPIC FirestoreClient that records usage per call."""
+
+    def __init__(self, api) -> None:
+        self._api = api
+
+    def __getattr__(self, name: str):
+        method = getattr(self._api, name)
+        if name not in _COUNTED:
+            return method
+
+        @functools.wraps(method)
+        def call(*args, **kwargs):
+            usage = _usage.get()
+            if usage is None:
+                return method(*args, **kwargs)
+            if name in _PAGED:
+                # The call fetches the first page. The pager fetches the rest
+                # through its _method, so wrap that as well.
+                pager = _count_page(method, usage, _PAGED[name])(*args, **kwargs)
+                pager._method = _count_page(pager._method, usage, _PAGED[name])
+                return pager
+            started = time.perf_counter()
+            if name in _STREAMS:
+                return _count_stream(
+                    method(*args, **kwargs), usage, started, *_STREAMS[name]
+                )
+            try:
+                return method(*args, **kwargs)
+            finally:
+                writes = (
+                    len(_request_field(kwargs.get("request"), "writes"))
+                    if name in _WRITES
+                    else 0
+                )
+                usage.add(writes=writes, rpcs=1, seconds=time.perf_counter() - started)
+
+        return call
+
+
+def instrument(client):
+    """Route ``client``'s RPCs through the usage accounting; returns ``client``."""
+    client._firestore_api_internal = _InstrumentedApi(client._firestore_api)
+    return client
+
+
+def server_timing(usage: FirestoreUsage, total: float) -> str:
+    return (
+        f'firestore;dur={usage.seconds * 1000:.1f};desc="{usage.rpcs} rpcs, '
+        f'{usage.reads} reads, {usage.writes} writes", '
+        f"total;dur={total * 1000:.1f}"
+    )
+
+
+def log_usage(
+    handler: str,
+    method: str,
+    path: str,
+    status: int,
+    usage: FirestoreUsage,
+    total: float,
+) -> None:
+    """Log one structured line per request for Cloud Logging."""
+    logger.info(
+        "%s %s: %d reads, %d writes, %d rpcs",
+        handler,
+        status,
+        usage.reads,
+        usage.writes,
+        usage.rpcs,
+        extra={
+            "fields": {
+                "handler": handler,
+                "method": method,
+                "path": path,
+                "status": status,
+                "latency_ms": round(total * 1000, 1),
+                "firestore": {
+                    "reads": usage.reads,
+                    "writes": usage.writes,
+                    "rpcs": usage.rpcs,
+                    "ms": round(usage.seconds * 1000, 1),
+                },
+            }
+        },
+    )
+
+
+def instrumented(handler: Callable[..., Response]) -> Callable[..., Response]:
+    """Account the Firestore usage of a ``handler(request, ...)``.
+
+    Buffered responses carry a Server-Timing header. Streamed responses keep
+    counting while the body is sent and are logged once it is done.
+    """
+
+    @functools.wraps(handler)
+    def wrapper(request: Request, *args, **kwargs) -> Response:
+        usage = FirestoreUsage()
+        # Streamed bodies finish after the request context is gone.
+        method, path = request.method, request.path
+        token = _usage.set(usage)
+        started = time.perf_counter()
+        try:
+            response = make_response(handler(request, *args, **kwargs))
+        except BaseException:
+            _usage.reset(token)
+            raise
+
+        def finish() -> None:
+            if not LOG_USAGE:
+                return
+            log_usage(
+                handler.__name__,
+                method,
+                path,
+                response.status_code,
+                usage,
+                time.perf_counter() - started,
+            )
+
+        if response.is_streamed:
+            # The body is generated on this thread after we return.
+            def close() -> None:
+                finish()
+                _usage.set(None)
+
+            response.call_on_close(close)
+            return response
+
+        _usage.reset(token)
+        response.headers["Server-Timing"] = server_timing(
+            usage, time.perf_counter() - started
+        )
+        response.headers["Timing-Allow-Origin"] = "*"
+        finish()
+        return response
+
+    return wrapper
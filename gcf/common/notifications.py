@@ -0,0 +1,148 @@
+"""Per-user unread notification counter.
+
+``users/{uid}/counters/notifications`` holds ``{"unread": n}`` so the
+notification badge costs one small document read. Every write that creates a
+notification or flips ``read`` moves the counter in the same batch or
+transaction: here through this module, and in functions/src by hand. A
+missing counter is seeded from an aggregation count by whichever comes first:
+a read of the count, or a write that moves it.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from itertools import islice
+from typing import TYPE_CHECKING
+
+from common import firestore
+
+if TYPE_CHECKING:
+    from google.cloud import firestore_v1
+
+# A transaction allows 500 writes; one is reserved for the counter.
+TRANSACTION_CHUNK = 499
+
+# How many notifications the inbox shows.
+LATEST_LIMIT = 10
+
+
+def notifications_ref(
+    db: firestore_v1.Client, user_id: str
+) -> firestore_v1.CollectionReference:
+    return db.collection("users").document(user_id).collection("notifications")
+
+
+def latest_notifications(
+    db: firestore_v1.Client, user_id: str, limit: int = LATEST_LIMIT
+) -> firestore_v1.Query:
+    return (
+        notifications_ref(db, user_id)
+        .order_by("timestamp", direction="DESCENDING")
+        .limit(limit)
+    )
+
+
+def counter_ref(
+    db: firestore_v1.Client, user_id: str
+) -> firestore_v1.DocumentReference:
+    return (
+        db.collection("users")
+        .document(user_id)
+        .collection("counters")
+        .document("notifications")
+    )
+
+
+def _count_unread(
+    transaction: firestore_v1.Transaction, db: firestore_v1.Client, user_id: str
+) -> int:
+    unread_query = notifications_ref(db, user_id).where("read", "==", False)
+    return int(unread_query.count().get(transaction=transaction)[0][0].value)
+
+
+def _add_in_transaction(
+    transaction: firestore_v1.Transaction,
+    db: firestore_v1.Client,
+    user_id: str,
+    notification: firestore_v1.DocumentReference,
+    data: dict,
+) -> None:
+    counter = counter_ref(db, user_id)
+    unread = not data.get("read", False)
+    if counter.get(transaction=transaction).exists:
+        if unread:
+            transaction.update(counter, {"unread": firestore.Increment(1)})
+    else:
+        seed = _count_unread(transaction, db, user_id) + unread
+        transaction.set(counter, {"unread": seed})
+    transaction.set(notification, {"read": False, **data})
+
+
+def add_notification(
+    db: firestore_v1.Client, user_id: str, data: dict
+) -> firestore_v1.DocumentReference:
+    """Create a notification and bump the counter in one transaction."""
+    notification = notifications_ref(db, user_id).document()
+    firestore.run_in_transaction(_add_in_transaction, db, user_id, notification, data)
+    return notification
+
+
+def _mark_read_in_transaction(
+    transaction: firestore_v1.Transaction,
+    db: firestore_v1.Client,
+    user_id: str,
+    refs: list[firestore_v1.DocumentReference],
+) -> int:
+    counter = counter_ref(db, user_id)
+    snapshots = {
+        snapshot.reference.path: snapshot
+        for snapshot in db.get_all(refs + [counter], transaction=transaction)
+    }
+    unread = [
+        ref
+        for ref in {ref.path: ref for ref in refs}.values()
+        if snapshots[ref.path].exists
+        and not snapshots[ref.path].to_dict().get("read", False)
+    ]
+    if not unread:
+        return 0
+    if snapshots[counter.path].exists:
+        transaction.update(counter, {"unread": firestore.Increment(-len(unread))})
+    else:
+        # The count runs inside the transaction, so it still sees these unread.
+        seed = _count_unread(transaction, db, user_id) - len(unread)
+        transaction.set(counter, {"unread": seed})
+    for ref in unread:
+        transaction.update(ref, {"read": True})
+    return len(unread)
+
+
+def mark_read(
+    db: firestore_v1.Client,
+    user_id: str,
+    refs: Iterable[firestore_v1.DocumentReference],
+) -> int:
+    """Mark notifications read, decrementing the counter by how many flipped."""
+    refs = iter(refs)
+    updated = 0
+    while chunk := list(islice(refs, TRANSACTION_CHUNK)):
+        updated += firestore.run_in_transaction(
+            _mark_read_in_transaction, db, user_id, chunk
+        )
+    return updated
+
+
+def unread_count(db: firestore_v1.Client, user_id: str) -> int:
+    counter = counter_ref(db, user_id)
+    counter_doc = counter.get()
+    if counter_doc.exists:
+        return counter_doc.to_dict().get("unread", 0)
+
+    unread_query = notifications_ref(db, user_id).where("read", "==", False)
+    count = int(unread_query.count().get()[0][0].value)
+    try:
+        counter.create({"unread": count})
+    except firestore.AlreadyExists:
+        # Seeded concurrently; the other writer's value is just as fresh.
+        pass
+    return count
@@ -0,0 +1,63 @@
+"""Cursor pagination over Firestore collections ordered by document ID.
+
+Document IDs give a stable, always-present ordering; the cursor handed to
+clients is an opaque URL-safe encoding of the last ID on the page.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from google.cloud import firestore_v1
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def encode_page_token(doc_id: str) -> str:
+    return base64.urlsafe_b64encode(doc_id.encode("utf-8")).decode("ascii")
+
+
+def decode_page_token(token: str) -> str:
+    try:
+        doc_id = base64.b64decode(token, altchars=b"-_", validate=True).decode("utf-8")
+    except (binascii.Error, UnicodeError) as e:
+        raise ValueError(f"Invalid page token: {token}") from e
+    if not doc_id:
+        raise ValueError(f"Invalid page token: {token}")
+    return doc_id
+
+
+def parse_page_size(value: str | None) -> int:
+    if value is None:
+        return DEFAULT_PAGE_SIZE
+    size = int(value)
+    if not 1 <= size <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return size
+
+
+def page_query(
+    collection: firestore_v1.CollectionReference,
+    limit: int,
+    start_after: str | None = None,
+) -> firestore_v1.Query:
+    """Query one page plus one lookahead document to detect a next page."""
+    document_id = "__name__"  # FieldPath.document_id()
+    query = collection.order_by(document_id).limit(limit + 1)
+    if start_after:
+        query = query.start_after({document_id: start_after})
+    return query
+
+
+def split_page(
+    docs: list[firestore_v1.DocumentSnapshot], limit: int
+) -> tuple[list[firestore_v1.DocumentSnapshot], str | None]:
+    """Drop the lookahead document and return the page with its next-page token."""
+    if len(docs) <= limit:
+        return docs, None
+    page = docs[:limit]
+    return page, encode_page_token(page[-1].id)
@@ -0,0 +1,30 @@
+"""``fields=`` query parameter parsing for Firestore projections.
+
+Clients pass a comma-separated list of field paths (``number,label`` or
+``profile.name``); handlers hand the result to ``select()`` or
+``get(field_paths=...)`` so only those fields leave Firestore.
+"""
+
+import re
+
+MAX_FIELDS = 32
+
+_FIELD_PATH = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*")
+
+
+def parse_fields(value: str | None) -> tuple[str, ...] | None:
+    """Field paths from a ``fields=`` value, or None to return every field.
+
+    The result is sorted and de-duplicated so it can be used in cache keys.
+    """
+    if value is None:
+        return None
+    fields = {field.strip() for field in value.split(",") if field.strip()}
+    if not fields:
+        raise ValueError("fields must name at least one field")
+    if len(fields) > MAX_FIELDS:
+        raise ValueError(f"fields may name at most {MAX_FIELDS} fields")
+    for field in fields:
+        if not _FIELD_PATH.fullmatch(field):
+            raise ValueError(f"Invalid field path: {field}")
+    return tuple(sorted(fields))
@@ -0,0 +1,89 @@
+"""Response helpers shared by the gcf handlers."""
+
+import hashlib
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from common.compression import MIN_SIZE, compress, negotiate_encoding
+from flask import Request, Response, json, stream_with_context
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+@dataclass
+class CachedPayload:
+    """A serialized JSON body and its strong ETag.
+
+    Compressed variants are kept alongside, so a cached payload is compressed
+    at most once per encoding.
+    """
+
+    body: bytes
+    etag: str
+    encoded: dict[str, bytes] = field(default_factory=dict, compare=False)
+
+    def encoded_body(self, encoding: str) -> bytes:
+        if encoding not in self.encoded:
+            self.encoded[encoding] = compress(self.body, encoding)
+        return self.encoded[encoding]
+
+
+def payload_from_bytes(body: bytes) -> CachedPayload:
+    return CachedPayload(
+        body=body, etag=hashlib.blake2b(body, digest_size=16).hexdigest()
+    )
+
+
+def serialize_payload(payload) -> CachedPayload:
+    body = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return payload_from_bytes(body)
+
+
+def cached_json_response(
+    request: Request, cached: CachedPayload, headers: dict, max_age: int
+) -> Response:
+    """Serve ``cached`` with ETag/Cache-Control, answering 304 on a match.
+
+    Payloads of ``MIN_SIZE`` or more are compressed to the client's preferred
+    encoding unless ``headers`` already set a Content-Encoding.
+    """
+    body, etag = cached.body, cached.etag
+    encoding = None
+    if "Content-Encoding" not in headers and len(body) >= MIN_SIZE:
+        headers = {**headers, "Vary": "Accept-Encoding"}
+        encoding = negotiate_encoding(request.accept_encodings)
+    if encoding is not None:
+        # Each representation needs its own strong ETag.
+        body, etag = cached.encoded_body(encoding), f"{etag}-{encoding}"
+        headers = {**headers, "Content-Encoding": encoding}
+
+    response = Response(body, mimetype="application/json", headers=headers)
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    return response.make_conditional(request)
+
+
+def wants_ndjson(request: Request) -> bool:
+    """True when the client explicitly prefers newline-delimited JSON."""
+    best = request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+
+def ndjson_response(records: Iterable[dict], headers: dict) -> Response:
+    """Stream ``records`` one JSON document per line as they are produced.
+
+    The status is sent before the first record, so a failure part-way through
+    is reported as a final ``{"error": ...}`` line.
+    """
+
+    def generate():
+        try:
+            for record in records:
+                yield json.dumps(record, separators=(",", ":")) + "\n"
+        except Exception as e:
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return Response(
+        stream_with_context(generate()), mimetype=NDJSON_MIMETYPE, headers=headers
+    )
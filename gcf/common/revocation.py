@@ -0,0 +1,162 @@
+"""In-memory view of ``token_blacklist`` for per-request revocation checks.
+
+Revoked tokens are kept in a Bloom filter, so the common "not revoked"
+answer needs no network I/O. A filter hit is confirmed with a single
+document read to rule out false positives. The filter is topped up from
+documents revoked since the last refresh and periodically rebuilt from the
+unexpired entries only, so tokens past their ``exp`` drop out of it. If
+Firestore fails during a refresh, the current filter keeps serving and the
+refresh is retried with exponential backoff. Until the first rebuild
+succeeds there is no filter to trust, so every token is looked up directly.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from google.cloud import firestore_v1
+
+BLACKLIST_COLLECTION = "token_blacklist"
+
+# Allow for commit latency between a document's revoked_at and its visibility.
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+# First retry delay after a failed refresh; doubles up to refresh_interval.
+RETRY_BACKOFF = 1.0
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.001) -> None:
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position // 8] |= 1 << (position % 8)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position // 8] & (1 << (position % 8))
+            for position in self._positions(item)
+        )
+
+
+class RevocationList:
+    def __init__(
+        self,
+        capacity: int = 10000,
+        refresh_interval: float = 30.0,
+        rebuild_interval: float = 3600.0,
+    ) -> None:
+        self.capacity = capacity
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self._filter = BloomFilter(capacity)
+        self._watermark: datetime | None = None
+        self._next_refresh_at: float | None = None
+        self._rebuilt_at: float | None = None
+        self._failures = 0
+        # Held by the one request running a refresh.
+        self._lock = threading.Lock()
+        # Held for every write to the filter, which request threads share.
+        self._filter_lock = threading.Lock()
+        # Tokens revoked locally since the running rebuild started.
+        self._revoked_locally: list[str] = []
+
+    def revoke_locally(self, token: str) -> None:
+        """Record a revocation made by this instance without waiting for a refresh."""
+        with self._filter_lock:
+            self._filter.add(token)
+            self._revoked_locally.append(token)
+
+    def is_revoked(self, db: firestore_v1.Client, token: str) -> bool:
+        self._maybe_refresh(db)
+        # Set only once the filter holds every unexpired revocation.
+        if self._rebuilt_at is not None and token not in self._filter:
+            return False
+        return db.collection(BLACKLIST_COLLECTION).document(token).get().exists
+
+    def _maybe_refresh(self, db: firestore_v1.Client) -> None:
+        now = time.monotonic()
+        if self._next_refresh_at is not None and now < self._next_refresh_at:
+            return
+        # Only one request pays for the refresh; the others use the current filter
+        # (or, before the first rebuild, read the blacklist directly).
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            if (
+                self._rebuilt_at is None
+                or now - self._rebuilt_at >= self.rebuild_interval
+            ):
+                self._rebuild(db)
+                self._rebuilt_at = now
+            else:
+                self._refresh(db)
+            self._failures = 0
+            self._next_refresh_at = now + self.refresh_interval
+        except Exception:
+            self._failures += 1
+            delay = min(
+                self.refresh_interval, RETRY_BACKOFF * 2 ** (self._failures - 1)
+            )
+            logger.warning(
+                "Revocation list refresh failed (%d in a row), retrying in %.0fs",
+                self._failures,
+                delay,
+                exc_info=True,
+            )
+            self._next_refresh_at = now + delay
+        finally:
+            self._lock.release()
+
+    def _rebuild(self, db: firestore_v1.Client) -> None:
+        started_at = datetime.now(timezone.utc)
+        with self._filter_lock:
+            self._revoked_locally = []
+        docs = list(
+            db.collection(BLACKLIST_COLLECTION)
+            .where("exp", ">", int(time.time()))
+            .stream()
+        )
+        bloom = BloomFilter(max(self.capacity, 2 * len(docs)))
+        for doc in docs:
+            bloom.add(doc.id)
+        with self._filter_lock:
+            # The query may have missed revocations this instance made since.
+            for token in self._revoked_locally:
+                bloom.add(token)
+            self._filter = bloom
+        self._watermark = started_at
+
+    def _refresh(self, db: firestore_v1.Client) -> None:
+        query = db.collection(BLACKLIST_COLLECTION).where(
+            "revoked_at", ">", self._watermark - REFRESH_OVERLAP
+        )
+        docs = list(query.stream())
+        with self._filter_lock:
+            for doc in docs:
+                self._filter.add(doc.id)
+                self._watermark = max(self._watermark, doc.get("revoked_at"))
+
+
+revocations = RevocationList()
@@ -0,0 +1,39 @@
+import functions_framework
+from cloudevents.http import CloudEvent
+from common import catalog
+from common.firestore import get_client
+from flask import Request, Response, jsonify
+from google.events.cloud.firestore import DocumentEventData
+
+
+@functions_framework.cloud_event
+def sync_exam_catalog(cloud_event: CloudEvent) -> None:
+    """Firestore trigger for writes to ``{competition}/{year}/{exam}/Info``."""
+    # The subject is "documents/{competition}/{year}/{exam}/Info".
+    competition, year, exam = cloud_event["subject"].split("/")[1:4]
+
+    event = DocumentEventData.deserialize(cloud_event.data)
+    info = None
+    if "value" in event:
+        fields = event.value.fields
+        info = {"private": "private" in fields and fields["private"].boolean_value}
+    catalog.sync_exam(get_client(), competition, year, exam, info)
+
+
+@functions_framework.http
+def rebuild_exam_catalog(request: Request) -> Response:
+    """Rebuild the catalog from the exam tree; run nightly by Cloud Scheduler.
+
+    Picks up exams created without an ``Info`` document, which the trigger
+    never sees.
+    """
+    try:
+        rows = catalog.rebuild_catalog(get_client())
+        return jsonify({"exams": len(rows)}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+if __name__ == "__main__":
+    rows = catalog.rebuild_catalog(get_client())
+    print(f"Catalog rebuilt with {len(rows)} exams")
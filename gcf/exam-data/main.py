@@ -1,9 +1,21 @@
+from common.bundles import check_segment, get_bundle_store
+from common.exam_data import (
+    CACHE_MAX_AGE,
+    bundle_response,
+    exam_cache,
+    exam_payload,
+    problems_query,
+)
+from common.firestore import get_client
+from common.instrumentation import ContextThreadPoolExecutor, instrumented
+from common.projection import parse_fields
+from common.responses import cached_json_response, serialize_payload
 from flask import Request, Response, jsonify
-from google.cloud import firestore_v1
 
-db = firestore_v1.Client(database="grindolympiads")
+executor = ContextThreadPoolExecutor(max_workers=4)
 
 
+@instrumented
 def get_exam_data(request: Request) -> Response:
     headers = {"Access-Control-Allow-Origin": "*"}
 
@@ -19,41 +31,47 @@ def get_exam_data(request: Request) -> Response:
         )
 
     try:
-        # Fetch problems
-        problems_ref = (
-            db.collection(competition)
-            .document(year)
-            .collection(exam)
-            .document("Problems")
-            .collection("Problems")
-        )
-        problems = problems_ref.order_by("number").stream()
-        problems_list = [{"problem_id": doc.id, **doc.to_dict()} for doc in problems]
-
-        # Fetch comment
-        test_comment_ref = (
-            db.collection(competition)
-            .document(year)
-            .collection(exam)
-            .document("Comment")
-        )
-        test_comment_doc = test_comment_ref.get()
-        test_comment = (
-            test_comment_doc.to_dict().get("comment", "")
-            if test_comment_doc.exists
-            else ""
-        )
+        # Each value names one collection or document, never a longer path.
+        for segment in (competition, year, exam):
+            check_segment(segment)
+        # Projects the problem documents, e.g. fields=number,label.
+        fields = parse_fields(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400, headers
+
+    try:
+        # Published exams are served straight from pre-compressed bundles when
+        # a bundle store is configured (see publish_bundles.py). Bundles hold
+        # whole problems, so projections go to Firestore.
+        bundle_store = get_bundle_store()
+        if bundle_store is not None and fields is None:
+            response = bundle_response(
+                request, bundle_store, competition, year, exam, headers
+            )
+            if response is not None:
+                return response
 
-        # Prepare response
-        response_data = {
-            "problems": problems_list,
-            "comment": test_comment,
-            "competition": competition,
-            "year": year,
-            "exam": exam,
-        }
+        cache_key = (competition, year, exam, fields)
+        cached = exam_cache.get(cache_key)
+        if cached is None:
+            cached = serialize_payload(load_exam_data(competition, year, exam, fields))
+            exam_cache.set(cache_key, cached)
 
-        return jsonify(response_data), 200, headers
+        return cached_json_response(request, cached, headers, CACHE_MAX_AGE)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500, headers
+
+
+def load_exam_data(
+    competition: str, year: str, exam: str, fields: tuple[str, ...] | None = None
+) -> dict:
+    exam_ref = get_client().collection(competition).document(year).collection(exam)
+
+    # Stream the problems on a worker thread while the comment is fetched here,
+    # so the request pays one round-trip of latency instead of two.
+    query = problems_query(exam_ref, fields)
+    problems_future = executor.submit(lambda: list(query.stream()))
+    comment_doc = exam_ref.document("Comment").get()
+
+    return exam_payload(competition, year, exam, problems_future.result(), comment_doc)
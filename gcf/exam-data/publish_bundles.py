@@ -0,0 +1,45 @@
+"""Publish compressed exam bundles for get_exam_data to serve.
+
+Set EXAM_BUNDLE_DIR (local directory) or EXAM_BUNDLE_BUCKET (Cloud Storage)
+to the same value the function is deployed with, then run either
+
+    python publish_bundles.py COMPETITION YEAR EXAM
+    python publish_bundles.py --all
+"""
+
+import argparse
+
+from common import catalog
+from common.bundles import bundle_store_from_env, publish_bundle
+from common.firestore import get_client
+from common.responses import serialize_payload
+from main import load_exam_data
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("exam", nargs="*", metavar="COMPETITION YEAR EXAM")
+    parser.add_argument("--all", action="store_true", help="publish every exam")
+    args = parser.parse_args()
+
+    store = bundle_store_from_env()
+    if store is None:
+        parser.error("EXAM_BUNDLE_DIR or EXAM_BUNDLE_BUCKET must be set")
+
+    if args.all:
+        db = get_client()
+        rows = catalog.load_catalog(db) or catalog.rebuild_catalog(db)
+        exams = [(row["competition"], row["year"], row["exam"]) for row in rows]
+    elif len(args.exam) == 3:
+        exams = [tuple(args.exam)]
+    else:
+        parser.error("expected COMPETITION YEAR EXAM or --all")
+
+    for competition, year, exam in exams:
+        payload = serialize_payload(load_exam_data(competition, year, exam))
+        publish_bundle(store, competition, year, exam, payload.body)
+        print(f"Published {competition} {year} {exam} ({len(payload.body)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
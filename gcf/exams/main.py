@@ -1,37 +1,31 @@
+from common import catalog
+from common.exam_data import (
+    CACHE_MAX_AGE,
+    EXAMS_CACHE_KEY,
+    cache_public_exams,
+    exams_cache,
+)
+from common.firestore import get_client
+from common.instrumentation import instrumented
+from common.responses import cached_json_response
 from flask import Request, Response, jsonify
-from google.cloud import firestore_v1
-
-db = firestore_v1.Client(database="grindolympiads")
 
 
+@instrumented
 def list_exams(request: Request) -> Response:
     headers = {"Access-Control-Allow-Origin": "*"}
 
     try:
-        competitions = db.collections()
-        tests = []
-        for competition in competitions:
-            competition_name = competition.id
-            years = competition.list_documents()
-            for year in years:
-                year_name = year.id
-                exams = year.collections()
-                for exam in exams:
-                    exam_name = exam.id
-                    exam_doc = exam.document("Info").get()
-                    if not exam_doc.exists or not exam_doc.to_dict().get(
-                        "private", False
-                    ):
-                        tests.append(
-                            {
-                                "competition": competition_name,
-                                "year": year_name,
-                                "exam": exam_name,
-                            }
-                        )
+        cached = exams_cache.get(EXAMS_CACHE_KEY)
+        if cached is None:
+            db = get_client()
+            rows = catalog.load_catalog(db)
+            if rows is None:
+                # First request after deploy: materialize the catalog once.
+                rows = catalog.rebuild_catalog(db)
+            cached = cache_public_exams(rows)
 
-        response_data = {"tests": tests}
-        return jsonify(response_data), 200, headers
+        return cached_json_response(request, cached, headers, CACHE_MAX_AGE)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500, headers
@@ -0,0 +1,87 @@
+"""Single-service entry point that routes to every gcf handler by path.
+
+Deploying this directory as one function (entry point ``route``), or serving
+``app`` with any WSGI server, lets one warm pool answer all traffic. The
+Firestore client, token caches and exam caches in ``common`` are then shared
+across endpoints instead of being rebuilt per function.
+
+    python main.py [--port 8080]
+"""
+
+import argparse
+import importlib.util
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+from flask import Flask, Request, Response, jsonify, request
+
+GCF_DIR = Path(__file__).resolve().parent
+
+# path -> (function directory, entry point)
+ROUTES = {
+    "/exams": ("exams", "list_exams"),
+    "/exam-data": ("exam-data", "get_exam_data"),
+    "/user": ("user", "get_user_info"),
+    "/user-progress": ("user-progress", "user_progress"),
+    "/notifications": ("notifications", "user_notifications"),
+    "/notifications/unread-count": ("notifications", "unread_notification_count"),
+    "/update-notification": ("update-notification", "mark_notification_read"),
+    "/update-notification/batch": ("update-notification", "mark_notifications_read"),
+    "/logout": ("logout", "logout"),
+    "/bootstrap": ("bootstrap", "session_bootstrap"),
+}
+
+_modules = {}
+_modules_lock = threading.Lock()
+
+
+def _load_module(function_dir: str):
+    """Import ``<function_dir>/main.py`` once, under a name unique to it."""
+    with _modules_lock:
+        if function_dir not in _modules:
+            name = "gcf_" + function_dir.replace("-", "_")
+            spec = importlib.util.spec_from_file_location(
+                name, GCF_DIR / function_dir / "main.py"
+            )
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            _modules[function_dir] = module
+        return _modules[function_dir]
+
+
+def resolve(path: str) -> Callable[[Request], Response] | None:
+    target = ROUTES.get(path.rstrip("/") or "/")
+    if target is None:
+        return None
+    function_dir, entry_point = target
+    return getattr(_load_module(function_dir), entry_point)
+
+
+def route(request: Request) -> Response:
+    handler = resolve(request.path)
+    if handler is None:
+        return (
+            jsonify({"error": f"Unknown path: {request.path}"}),
+            404,
+            {"Access-Control-Allow-Origin": "*"},
+        )
+    return handler(request)
+
+
+app = Flask(__name__)
+
+
+@app.route("/", defaults={"_path": ""}, methods=["GET", "POST", "OPTIONS"])
+@app.route("/<path:_path>", methods=["GET", "POST", "OPTIONS"])
+def dispatch(_path: str) -> Response:
+    return route(request)
+
+
+if __name__ == "__main__":
+    from werkzeug.serving import run_simple
+
+    parser = argparse.ArgumentParser(description="Serve all gcf handlers locally")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+    run_simple("127.0.0.1", args.port, app, threaded=True)
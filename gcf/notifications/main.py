@@ -1,42 +1,30 @@
-import jwt
+from common.auth import require_auth
+from common.compression import compressed
+from common.firestore import get_client
+from common.instrumentation import instrumented
+from common.notifications import latest_notifications, unread_count
+from common.responses import ndjson_response, wants_ndjson
 from flask import Request, Response, jsonify
-from google.cloud import firestore_v1
 
-db = firestore_v1.Client(database="grindolympiads")
-SECRET_KEY = (
-    "a_secure_random_secret_key"  # Use the same secret key as in the login function
-)
+HEADERS = {"Access-Control-Allow-Origin": "*"}
 
 
-def user_notifications(request: Request) -> Response:
-    headers = {"Access-Control-Allow-Origin": "*"}
-
-    # Verify JWT token
-    auth_header = request.headers.get("Authorization")
-    if not auth_header:
-        return jsonify({"error": "Authorization header missing"}), 401, headers
-
-    try:
-        token = auth_header.split(" ")[1]
-        decoded_token = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        user_id = decoded_token["user_id"]
-    except jwt.ExpiredSignatureError:
-        return jsonify({"error": "Token has expired"}), 401, headers
-    except jwt.InvalidTokenError:
-        return jsonify({"error": "Invalid token"}), 401, headers
-
+@instrumented
+@compressed
+@require_auth(HEADERS)
+def user_notifications(request: Request, user_id: str) -> Response:
     try:
         # Fetch notifications for the authenticated user
-        notifications_ref = (
-            db.collection("users").document(user_id).collection("notifications")
-        )
-        notifications = (
-            notifications_ref.order_by(
-                "timestamp", direction=firestore_v1.Query.DESCENDING
+        notifications = latest_notifications(get_client(), user_id).stream()
+
+        if wants_ndjson(request):
+            return ndjson_response(
+                (
+                    {**notification.to_dict(), "id": notification.id}
+                    for notification in notifications
+                ),
+                HEADERS,
             )
-            .limit(10)
-            .stream()
-        )
 
         notifications_list = []
         for notification in notifications:
@@ -44,6 +32,15 @@ def user_notifications(request: Request) -> Response:
             notification_data["id"] = notification.id
             notifications_list.append(notification_data)
 
-        return jsonify(notifications_list), 200, headers
+        return jsonify(notifications_list), 200, HEADERS
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500, HEADERS
+
+
+@instrumented
+@require_auth(HEADERS)
+def unread_notification_count(request: Request, user_id: str) -> Response:
+    try:
+        return jsonify({"unread": unread_count(get_client(), user_id)}), 200, HEADERS
     except Exception as e:
-        return jsonify({"error": str(e)}), 500, headers
+        return jsonify({"error": str(e)}), 500, HEADERS
@@ -0,0 +1,62 @@
+import sys
+import uuid
+from collections.abc import Callable, Iterator
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+GCF_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(GCF_DIR))
+sys.path.insert(0, str(GCF_DIR / "bench"))
+
+import jwt  # noqa: E402
+import main as router  # noqa: E402
+from common import auth, exam_data, instrumentation  # noqa: E402
+from common.bundles import use_bundle_store  # noqa: E402
+from common.firestore import use_async_client, use_client  # noqa: E402
+from common.revocation import RevocationList  # noqa: E402
+from fake_firestore import AsyncFakeClient, FakeClient  # noqa: E402
+from flask.testing import FlaskClient  # noqa: E402
+
+
+@pytest.fixture
+def db(monkeypatch: pytest.MonkeyPatch) -> Iterator[FakeClient]:
+    """An empty fake database behind get_client, with fresh per-process state."""
+    db = FakeClient()
+    use_client(db)
+    use_bundle_store(None)
+    # Function modules keep warm-instance caches; load them anew per test.
+    monkeypatch.setattr(router, "_modules", {})
+    monkeypatch.setattr(auth, "revocations", RevocationList())
+    monkeypatch.setattr(instrumentation, "LOG_USAGE", False)
+    auth.token_cache.invalidate()
+    exam_data.exam_cache.invalidate()
+    exam_data.exams_cache.invalidate()
+    yield db
+    use_client(None)
+    use_async_client(None)
+
+
+@pytest.fixture
+def async_db(db: FakeClient) -> AsyncFakeClient:
+    """``db`` behind get_async_client, for the asgi.py handlers."""
+    async_db = AsyncFakeClient(db)
+    use_async_client(async_db)
+    return async_db
+
+
+@pytest.fixture
+def client(db: FakeClient) -> FlaskClient:
+    return router.app.test_client()
+
+
+@pytest.fixture
+def auth_headers() -> Callable[..., dict]:
+    def make(user_id: str, hours: int = 2) -> dict:
+        exp = datetime.now(timezone.utc) + timedelta(hours=hours)
+        claims = {"user_id": user_id, "exp": exp, "jti": uuid.uuid4().hex}
+        token = jwt.encode(claims, auth.SECRET_KEY, algorithm="HS256")
+        return {"Authorization": f"Bearer {token}"}
+
+    return make
@@ -0,0 +1,226 @@
+import asyncio
+import gzip
+import json
+from collections.abc import Callable
+from pathlib import Path
+from urllib.parse import urlencode
+
+import asgi
+import pytest
+from common import catalog
+from common.bundles import LocalBundleStore, publish_bundle, use_bundle_store
+from common.responses import serialize_payload
+from fake_firestore import AsyncFakeClient, FakeClient
+from flask.testing import FlaskClient
+
+EXAM = {"competition": "AMC10", "year": "2023", "exam": "A"}
+
+
+async def serve(scope: dict, messages: list[dict] = ()) -> list[dict]:
+    """Run ``asgi.app`` on ``scope`` and return the messages it sent."""
+    incoming = list(messages)
+    sent = []
+
+    async def receive() -> dict:
+        return incoming.pop(0)
+
+    async def send(message: dict) -> None:
+        sent.append(message)
+
+    await asgi.app(scope, receive, send)
+    return sent
+
+
+def call(scope: dict, messages: list[dict] = ()) -> list[dict]:
+    return asyncio.run(serve(scope, messages))
+
+
+def http_scope(path: str, args: dict | None, headers: dict | None) -> dict:
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": urlencode(args or {}).encode("latin-1"),
+        "headers": [
+            (k.lower().encode("latin-1"), v.encode("latin-1"))
+            for k, v in (headers or {}).items()
+        ],
+    }
+
+
+def get(path: str, args: dict | None = None, headers: dict | None = None) -> tuple:
+    start, body = call(http_scope(path, args, headers))
+    return start["status"], dict(start["headers"]), body["body"]
+
+
+def get_json_concurrently(*requests: tuple) -> list:
+    """Serve ``(path, args, headers)`` requests on one event loop at once."""
+
+    async def run() -> list:
+        return await asyncio.gather(
+            *(serve(http_scope(*request)) for request in requests)
+        )
+
+    responses = []
+    for start, body in asyncio.run(run()):
+        assert start["status"] == 200, body["body"]
+        responses.append(json.loads(body["body"]))
+    return responses
+
+
+def test_lifespan_events_are_acknowledged() -> None:
+    sent = call(
+        {"type": "lifespan"},
+        [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}],
+    )
+
+    assert [message["type"] for message in sent] == [
+        "lifespan.startup.complete",
+        "lifespan.shutdown.complete",
+    ]
+
+
+def test_other_scope_types_are_rejected() -> None:
+    sent = call({"type": "websocket"}, [{"type": "websocket.connect"}])
+    assert sent == [{"type": "websocket.close"}]
+
+    with pytest.raises(ValueError):
+        call({"type": "unknown"})
+
+
+def test_exam_data_shares_the_flask_cache(db: FakeClient, client: FlaskClient) -> None:
+    exam_ref = db.collection("AMC10").document("2023").collection("A")
+    exam_ref.document("Comment").set({"comment": "Fall contest"})
+    flask_response = client.get("/exam-data", query_string=EXAM)
+
+    # A cache hit never reaches the async client.
+    status, headers, body = get("/exam-data", EXAM)
+
+    assert status == 200
+    assert body == flask_response.get_data()
+    assert headers[b"etag"].decode() == flask_response.headers["ETag"]
+
+
+def test_exam_data_serves_published_bundles(db: FakeClient, tmp_path: Path) -> None:
+    store = LocalBundleStore(str(tmp_path))
+    published = serialize_payload({"bundled": True})
+    publish_bundle(store, "AMC10", "2023", "A", published.body)
+    use_bundle_store(store)
+
+    status, headers, body = get("/exam-data", EXAM, {"Accept-Encoding": "gzip"})
+
+    assert status == 200
+    assert headers[b"content-encoding"] == b"gzip"
+    assert gzip.decompress(body) == published.body
+
+
+def test_exam_data_rejects_path_segments(db: FakeClient) -> None:
+    status, _, body = get("/exam-data", {**EXAM, "competition": ".."})
+
+    assert status == 400
+    assert json.loads(body) == {"error": "Invalid path segment: '..'"}
+
+
+def test_preflight_and_unknown_paths() -> None:
+    preflight = {"type": "http", "method": "OPTIONS", "path": "/exams", "headers": []}
+
+    assert call(preflight)[0]["status"] == 204
+    assert get("/nowhere")[0] == 404
+
+
+def test_exam_data_reads_problems_and_comment_concurrently(
+    db: FakeClient, async_db: AsyncFakeClient
+) -> None:
+    exam_ref = db.collection("AMC10").document("2023").collection("A")
+    exam_ref.document("Comment").set({"comment": "Fall contest"})
+    problems = exam_ref.document("Problems").collection("Problems")
+    for number in (2, 1):
+        problems.document(f"p{number}").set({"number": number, "answer": "42"})
+
+    status, _, body = get("/exam-data", {**EXAM, "fields": "number"})
+
+    assert status == 200
+    assert json.loads(body) == {
+        **EXAM,
+        "comment": "Fall contest",
+        "problems": [
+            {"problem_id": "p1", "number": 1},
+            {"problem_id": "p2", "number": 2},
+        ],
+    }
+    assert async_db.peak_rpcs == 2
+
+
+def test_list_exams_reads_the_catalog(
+    db: FakeClient, async_db: AsyncFakeClient
+) -> None:
+    for exam, private in (("A", False), ("B", True)):
+        exam_ref = db.collection("AMC10").document("2023").collection(exam)
+        exam_ref.document("Info").set({"private": private})
+    catalog.rebuild_catalog(db)
+
+    responses = get_json_concurrently(*[("/exams", None, None)] * 3)
+
+    expected = {"tests": [{"competition": "AMC10", "year": "2023", "exam": "A"}]}
+    assert responses == [expected] * 3
+    assert async_db.peak_rpcs == 3
+
+
+def test_list_exams_builds_a_missing_catalog(
+    db: FakeClient, async_db: AsyncFakeClient
+) -> None:
+    db.collection("AIME").document("2022").collection("I").document("Info").set({})
+
+    status, _, body = get("/exams")
+
+    assert status == 200
+    assert json.loads(body) == {
+        "tests": [{"competition": "AIME", "year": "2022", "exam": "I"}]
+    }
+    assert catalog.load_catalog(db) is not None
+
+
+def test_user_info_reads_run_concurrently(
+    db: FakeClient, async_db: AsyncFakeClient, auth_headers: Callable[..., dict]
+) -> None:
+    for user_id in ("alice", "bob"):
+        db.collection("users").document(user_id).set(
+            {"name": user_id.title(), "email": f"{user_id}@example.com"}
+        )
+
+    responses = get_json_concurrently(
+        ("/user", {"fields": "name"}, auth_headers("alice")),
+        ("/user", None, auth_headers("bob")),
+    )
+
+    assert responses == [
+        {"user": {"name": "Alice"}},
+        {"user": {"name": "Bob", "email": "bob@example.com"}},
+    ]
+    assert async_db.peak_rpcs == 2
+
+
+def test_user_progress_reads_run_concurrently(
+    db: FakeClient, async_db: AsyncFakeClient, auth_headers: Callable[..., dict]
+) -> None:
+    progress = db.collection("users").document("alice").collection("progress")
+    for number in range(3):
+        progress.document(f"p{number}").set({"score": number})
+    headers = auth_headers("alice")
+
+    unpaged, first_page = get_json_concurrently(
+        ("/user-progress", None, headers),
+        ("/user-progress", {"limit": "2"}, headers),
+    )
+
+    assert unpaged == [{"score": n, "id": f"p{n}"} for n in range(3)]
+    assert first_page["progress"] == unpaged[:2]
+    assert async_db.peak_rpcs == 2
+    (last_page,) = get_json_concurrently(
+        (
+            "/user-progress",
+            {"limit": "2", "start_after": first_page["next_page_token"]},
+            headers,
+        )
+    )
+    assert last_page == {"progress": unpaged[2:], "next_page_token": None}
@@ -0,0 +1,18 @@
+from collections.abc import Callable
+
+from fake_firestore import FakeClient
+from flask.testing import FlaskClient
+
+
+def test_require_auth_rejects_bad_tokens(
+    db: FakeClient, client: FlaskClient, auth_headers: Callable[..., dict]
+) -> None:
+    missing = client.get("/user")
+    expired = client.get("/user", headers=auth_headers("alice", hours=-1))
+    garbage = client.get("/user", headers={"Authorization": "Bearer nonsense"})
+
+    assert missing.status_code == expired.status_code == garbage.status_code == 401
+    assert missing.get_json() == {"error": "Authorization header missing"}
+    assert expired.get_json() == {"error": "Token has expired"}
+    assert garbage.get_json() == {"error": "Invalid token"}
+    assert client.options("/user").status_code == 204
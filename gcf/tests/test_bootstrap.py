@@ -0,0 +1,39 @@
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+from fake_firestore import FakeClient
+from flask.testing import FlaskClient
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def test_session_bootstrap_combines_the_session_reads(
+    db: FakeClient, client: FlaskClient, auth_headers: Callable[..., dict]
+) -> None:
+    user_ref = db.collection("users").document("alice")
+    user_ref.set({"name": "Alice"})
+    for number in range(3):
+        user_ref.collection("progress").document(f"p{number}").set({"score": number})
+    for minute in range(2):
+        user_ref.collection("notifications").document(f"n{minute}").set(
+            {"read": False, "timestamp": START + timedelta(minutes=minute)}
+        )
+
+    response = client.get(
+        "/bootstrap", headers=auth_headers("alice"), query_string={"limit": "2"}
+    )
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body["user"] == {"name": "Alice"}
+    assert [item["id"] for item in body["progress"]] == ["p0", "p1"]
+    assert body["next_page_token"] is not None
+    assert [item["id"] for item in body["notifications"]] == ["n1", "n0"]
+
+
+def test_session_bootstrap_needs_the_user(
+    db: FakeClient, client: FlaskClient, auth_headers: Callable[..., dict]
+) -> None:
+    response = client.get("/bootstrap", headers=auth_headers("nobody"))
+
+    assert response.status_code == 404
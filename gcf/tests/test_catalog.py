@@ -0,0 +1,220 @@
+from datetime import datetime
+
+import flask
+import main as router
+import pytest
+from cloudevents.http import CloudEvent
+from common import catalog
+from fake_firestore import FakeClient
+from flask.testing import FlaskClient
+from google.events.cloud.firestore import Document, DocumentEventData, Value
+
+
+def add_exam(db: FakeClient, competition: str, year: str, exam: str, **info) -> None:
+    exam_ref = db.collection(competition).document(year).collection(exam)
+    if info:
+        exam_ref.document("Info").set(info)
+    exam_ref.document("Comment").set({"comment": f"{competition} {year} {exam}"})
+
+
+def tree_order(row: dict) -> tuple[str, str, str]:
+    return row["competition"], row["year"], row["exam"]
+
+
+def test_rebuild_catalog_scans_the_exam_tree(db: FakeClient) -> None:
+    add_exam(db, "AMC10", "2023", "A")
+    add_exam(db, "AMC10", "2023", "B", private=True)
+    add_exam(db, "AIME", "2022", "I", private=False)
+    db.collection("users").document("alice").set({"name": "Alice"})
+
+    rows = catalog.rebuild_catalog(db)
+
+    assert sorted(rows, key=tree_order) == [
+        catalog.catalog_row("AIME", "2022", "I", False),
+        catalog.catalog_row("AMC10", "2023", "A", False),
+        catalog.catalog_row("AMC10", "2023", "B", True),
+    ]
+    assert sorted(catalog.load_catalog(db), key=tree_order) == sorted(
+        rows, key=tree_order
+    )
+    assert catalog.public_exams(rows) == [
+        {"competition": "AIME", "year": "2022", "exam": "I"},
+        {"competition": "AMC10", "year": "2023", "exam": "A"},
+    ]
+
+
+def storage_size(value) -> int:
+    """Firestore's storage size of a field value, per its documented rules."""
+    if isinstance(value, dict):
+        return sum(len(key) + 1 + storage_size(item) for key, item in value.items())
+    if isinstance(value, str):
+        return len(value.encode("utf-8")) + 1
+    return 8 if isinstance(value, (int, float, datetime)) else 1
+
+
+def index_entries(value) -> int:
+    """Single-field index entries (ascending and descending) without exemptions."""
+    if isinstance(value, dict):
+        return sum(2 + index_entries(item) for item in value.values())
+    return 0
+
+
+def test_catalog_shards_stay_within_document_limits(
+    db: FakeClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Ten times the 2000 exams bench/load_test.py seeds by default.
+    rows = [
+        catalog.catalog_row(f"COMP{c:03d}", str(1990 + y), exam, y % 7 == 0)
+        for c in range(100)
+        for y in range(35)
+        for exam in ("A", "B", "I", "II", "Final", "Team")
+    ]
+    monkeypatch.setattr(catalog, "scan_exams", lambda db: rows)
+
+    catalog.rebuild_catalog(db)
+
+    shards = [doc.to_dict() for doc in db.get_all(catalog.catalog_refs(db))]
+    assert sum(len(shard["exams"]) for shard in shards) == len(rows)
+    for shard in shards:
+        # Leave half of the 1 MiB limit for rows still to come.
+        assert storage_size(shard) < 1024 * 1024 // 2
+        # Within the per-document limit even without the index exemption.
+        assert index_entries(shard) < 40000
+
+
+def test_scan_round_trips_do_not_grow_with_the_exam_count(db: FakeClient) -> None:
+    add_exam(db, "AMC10", "2023", "A")
+    db.reset_stats()
+    catalog.scan_exams(db)
+    one_exam = db.reset_stats()["rpcs"]
+    for exam in "BCDE":
+        add_exam(db, "AMC10", "2023", exam, private=True)
+    db.reset_stats()
+
+    assert len(catalog.scan_exams(db)) == 5
+    assert db.reset_stats()["rpcs"] == one_exam
+
+
+def test_load_catalog_is_none_before_the_first_build(db: FakeClient) -> None:
+    assert catalog.load_catalog(db) is None
+
+
+def test_list_exams_reads_the_catalog_in_one_round_trip(
+    db: FakeClient, client: FlaskClient
+) -> None:
+    add_exam(db, "AMC10", "2023", "A")
+    catalog.rebuild_catalog(db)
+    db.reset_stats()
+
+    response = client.get("/exams")
+
+    assert response.status_code == 200
+    assert response.get_json() == {
+        "tests": [{"competition": "AMC10", "year": "2023", "exam": "A"}]
+    }
+    stats = db.reset_stats()
+    assert stats["rpcs"] == 1
+    assert stats["reads"] == catalog.CATALOG_SHARDS
+
+
+def test_list_exams_builds_a_missing_catalog(
+    db: FakeClient, client: FlaskClient
+) -> None:
+    add_exam(db, "AMC10", "2023", "A")
+
+    response = client.get("/exams")
+
+    assert response.get_json()["tests"] == [
+        {"competition": "AMC10", "year": "2023", "exam": "A"}
+    ]
+    assert catalog.load_catalog(db) is not None
+
+
+def test_list_exams_revalidates_with_etag(db: FakeClient, client: FlaskClient) -> None:
+    add_exam(db, "AMC10", "2023", "A")
+    etag = client.get("/exams").headers["ETag"]
+
+    response = client.get("/exams", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.get_data() == b""
+
+
+def test_sync_exam_upserts_and_removes_rows(db: FakeClient) -> None:
+    add_exam(db, "AMC10", "2023", "A")
+    catalog.rebuild_catalog(db)
+
+    add_exam(db, "AMC10", "2023", "B", private=True)
+    catalog.sync_exam(db, "AMC10", "2023", "B", {"private": True})
+    catalog.sync_exam(db, "AMC10", "2023", "A", {"private": False})
+    assert sorted(catalog.load_catalog(db), key=tree_order) == [
+        catalog.catalog_row("AMC10", "2023", "A", False),
+        catalog.catalog_row("AMC10", "2023", "B", True),
+    ]
+
+    exam_ref = db.collection("AMC10").document("2023").collection("B")
+    exam_ref.document("Info").delete()
+    catalog.sync_exam(db, "AMC10", "2023", "B", None)
+    # Comment is still there, so B stays listed, now as public.
+    assert catalog.catalog_row("AMC10", "2023", "B", False) in catalog.load_catalog(db)
+
+    exam_ref.document("Comment").delete()
+    catalog.sync_exam(db, "AMC10", "2023", "B", None)
+    assert catalog.load_catalog(db) == [
+        catalog.catalog_row("AMC10", "2023", "A", False)
+    ]
+
+
+def test_sync_exam_builds_a_missing_catalog_in_full(db: FakeClient) -> None:
+    add_exam(db, "AMC10", "2023", "A")
+    add_exam(db, "AMC10", "2023", "B", private=True)
+
+    catalog.sync_exam(db, "AMC10", "2023", "B", {"private": True})
+
+    assert len(catalog.load_catalog(db)) == 2
+
+
+def test_trigger_decodes_firestore_events(db: FakeClient) -> None:
+    add_exam(db, "AMC10", "2023", "A")
+    catalog.rebuild_catalog(db)
+    trigger = router._load_module("exam-catalog").sync_exam_catalog
+
+    def event(**data) -> CloudEvent:
+        attributes = {
+            "type": "google.cloud.firestore.document.v1.written",
+            "source": "//firestore.googleapis.com/projects/olympiads/databases/x",
+            "subject": "documents/AMC10/2023/A/Info",
+            "datacontenttype": "application/protobuf",
+        }
+        return CloudEvent(
+            attributes, DocumentEventData.serialize(DocumentEventData(**data))
+        )
+
+    trigger(event(value=Document(fields={"private": Value(boolean_value=True)})))
+    assert catalog.load_catalog(db) == [catalog.catalog_row("AMC10", "2023", "A", True)]
+
+    trigger(event(value=Document(fields={})))
+    assert catalog.load_catalog(db) == [
+        catalog.catalog_row("AMC10", "2023", "A", False)
+    ]
+
+    db.collection("AMC10").document("2023").collection("A").document("Comment").delete()
+    trigger(event(old_value=Document(fields={})))
+    assert catalog.load_catalog(db) == []
+
+
+def test_scheduled_rebuild_catalogs_exams_without_info(db: FakeClient) -> None:
+    add_exam(db, "AMC10", "2023", "A")
+    catalog.rebuild_catalog(db)
+    add_exam(db, "AMC10", "2023", "B")
+    rebuild = router._load_module("exam-catalog").rebuild_exam_catalog
+
+    with router.app.test_request_context("/", method="POST"):
+        response, status = rebuild(flask.request)
+
+    assert status == 200
+    assert response.get_json() == {"exams": 2}
+    assert sorted(catalog.load_catalog(db), key=tree_order) == [
+        catalog.catalog_row("AMC10", "2023", "A", False),
+        catalog.catalog_row("AMC10", "2023", "B", False),
+    ]
@@ -0,0 +1,126 @@
+import gzip
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from common.bundles import (
+    LocalBundleStore,
+    bundle_name,
+    publish_bundle,
+    use_bundle_store,
+)
+from common.responses import serialize_payload
+from fake_firestore import FakeClient
+from flask.testing import FlaskClient
+
+EXAM = {"competition": "AMC10", "year": "2023", "exam": "A"}
+
+
+@pytest.fixture
+def exam(db: FakeClient) -> None:
+    exam_ref = db.collection("AMC10").document("2023").collection("A")
+    exam_ref.document("Comment").set({"comment": "Fall contest"})
+    problems = exam_ref.document("Problems").collection("Problems")
+    for number in (2, 1):
+        problems.document(f"p{number}").set(
+            {"number": number, "label": f"Problem {number}", "answer": "42"}
+        )
+
+
+def test_get_exam_data_orders_problems(exam: None, client: FlaskClient) -> None:
+    response = client.get("/exam-data", query_string=EXAM)
+
+    assert response.status_code == 200
+    assert response.get_json() == {
+        **EXAM,
+        "comment": "Fall contest",
+        "problems": [
+            {"problem_id": "p1", "number": 1, "label": "Problem 1", "answer": "42"},
+            {"problem_id": "p2", "number": 2, "label": "Problem 2", "answer": "42"},
+        ],
+    }
+
+
+def test_get_exam_data_is_cached_per_instance(
+    db: FakeClient, exam: None, client: FlaskClient
+) -> None:
+    client.get("/exam-data", query_string=EXAM)
+    db.reset_stats()
+
+    assert client.get("/exam-data", query_string=EXAM).status_code == 200
+    assert db.reset_stats()["reads"] == 0
+
+
+def test_get_exam_data_projects_fields(exam: None, client: FlaskClient) -> None:
+    response = client.get("/exam-data", query_string={**EXAM, "fields": "number"})
+
+    assert response.get_json()["problems"] == [
+        {"problem_id": "p1", "number": 1},
+        {"problem_id": "p2", "number": 2},
+    ]
+    invalid = client.get("/exam-data", query_string={**EXAM, "fields": "a b"})
+    assert invalid.status_code == 400
+
+
+def test_get_exam_data_requires_the_exam(exam: None, client: FlaskClient) -> None:
+    response = client.get("/exam-data", query_string={"competition": "AMC10"})
+
+    assert response.status_code == 400
+
+
+def test_get_exam_data_serves_published_bundles(
+    db: FakeClient, exam: None, client: FlaskClient, tmp_path: Path
+) -> None:
+    store = LocalBundleStore(str(tmp_path))
+    published = serialize_payload({"bundled": True})
+    publish_bundle(store, "AMC10", "2023", "A", published.body)
+    use_bundle_store(store)
+    db.reset_stats()
+
+    response = client.get(
+        "/exam-data", query_string=EXAM, headers={"Accept-Encoding": "gzip"}
+    )
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.get_data()) == published.body
+    assert db.reset_stats()["reads"] == 0
+
+
+def test_get_user_info_projects_fields(
+    db: FakeClient, client: FlaskClient, auth_headers: Callable[..., dict]
+) -> None:
+    db.collection("users").document("alice").set({"name": "Alice", "points": 7})
+
+    response = client.get(
+        "/user", headers=auth_headers("alice"), query_string={"fields": "points"}
+    )
+
+    assert response.get_json() == {"user": {"points": 7}}
+
+
+@pytest.mark.parametrize("competition", ["..", "AMC10/2023", "", "a\\b"])
+def test_get_exam_data_rejects_path_segments(
+    db: FakeClient, client: FlaskClient, tmp_path: Path, competition: str
+) -> None:
+    use_bundle_store(LocalBundleStore(str(tmp_path / "bundles")))
+    (tmp_path / "secret.json.gz").write_bytes(b"secret")
+
+    response = client.get(
+        "/exam-data",
+        query_string={"competition": competition, "year": "..", "exam": "secret"},
+        headers={"Accept-Encoding": "gzip"},
+    )
+
+    assert response.status_code == 400
+    assert b"secret" not in response.get_data()
+
+
+def test_bundle_store_stays_inside_its_directory(tmp_path: Path) -> None:
+    store = LocalBundleStore(str(tmp_path / "bundles"))
+    (tmp_path / "secret.json.gz").write_bytes(b"secret")
+
+    with pytest.raises(ValueError):
+        bundle_name("..", "..", "secret", "gzip")
+    with pytest.raises(ValueError):
+        store.read("../secret.json.gz")
+    assert store.read("AMC10/2023/A.json.gz") is None
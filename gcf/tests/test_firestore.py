@@ -0,0 +1,50 @@
+import threading
+
+import pytest
+from common import firestore
+from fake_firestore import FakeClient
+from flask.testing import FlaskClient
+from google.cloud import firestore_v1
+
+
+def test_client_library_names_are_imported_on_first_use() -> None:
+    from google.api_core import exceptions
+    from google.cloud import firestore_v1
+
+    assert firestore.SERVER_TIMESTAMP is firestore_v1.SERVER_TIMESTAMP
+    assert firestore.NotFound is exceptions.NotFound
+    with pytest.raises(AttributeError):
+        firestore.NoSuchName
+
+
+def test_run_in_transaction_from_many_threads(db: FakeClient) -> None:
+    counter = db.collection("counters").document("c")
+
+    def bump(transaction, db: FakeClient) -> None:
+        transaction.set(counter, {"n": firestore.Increment(1)}, merge=True)
+
+    def run() -> None:
+        for _ in range(5):
+            firestore.run_in_transaction(bump, db)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.get().to_dict() == {"n": 20}
+
+
+def test_rejected_requests_never_build_a_client(
+    client: FlaskClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def build_client(*args, **kwargs) -> None:
+        raise AssertionError("built a Firestore client")
+
+    monkeypatch.setattr(firestore, "_client", None)
+    monkeypatch.setattr(firestore_v1, "Client", build_client)
+
+    assert client.options("/user").status_code == 204
+    assert client.get("/user").status_code == 401
+    assert client.get("/exam-data").status_code == 400
@@ -0,0 +1,108 @@
+import json
+from collections.abc import Callable
+
+import pytest
+from common import instrumentation
+from common.instrumentation import (
+    ContextThreadPoolExecutor,
+    FirestoreUsage,
+    StructuredFormatter,
+    _InstrumentedApi,
+    _usage,
+    record,
+)
+from fake_firestore import FakeClient
+from flask.testing import FlaskClient
+from google.cloud.firestore_v1.services.firestore.pagers import ListDocumentsPager
+from google.cloud.firestore_v1.types import (
+    Document,
+    ListDocumentsRequest,
+    ListDocumentsResponse,
+)
+
+
+def test_context_thread_pool_counts_towards_the_submitter() -> None:
+    usage = FirestoreUsage()
+    token = _usage.set(usage)
+    try:
+        with ContextThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(lambda _: record(reads=2, rpcs=1), range(3)))
+    finally:
+        _usage.reset(token)
+
+    assert (usage.reads, usage.rpcs) == (6, 3)
+
+
+def test_record_without_a_request_is_ignored() -> None:
+    record(reads=1)
+
+
+def test_handlers_report_server_timing(
+    db: FakeClient, client: FlaskClient, auth_headers: Callable[..., dict]
+) -> None:
+    notifications = db.collection("users").document("alice").collection("notifications")
+    for number in range(3):
+        notifications.document(f"n{number}").set(
+            {"message": "hi", "timestamp": number, "read": False}
+        )
+
+    headers = auth_headers("alice")
+    # The first request also loads the revocation list.
+    client.get("/notifications", headers=headers)
+
+    response = client.get("/notifications", headers=headers)
+
+    assert response.status_code == 200
+    assert '"1 rpcs, 3 reads, 0 writes"' in response.headers["Server-Timing"]
+    assert response.headers["Timing-Allow-Origin"] == "*"
+
+
+def test_each_list_documents_page_is_a_round_trip() -> None:
+    pages = [
+        ListDocumentsResponse(
+            documents=[Document(name=f"d{i}") for i in range(2)], next_page_token="2"
+        ),
+        ListDocumentsResponse(documents=[Document(name="d2")], next_page_token="3"),
+        ListDocumentsResponse(documents=[]),
+    ]
+
+    def fetch_page(request, metadata=()) -> ListDocumentsResponse:
+        return pages.pop(0)
+
+    class Api:
+        def list_documents(self, request, metadata=()) -> ListDocumentsPager:
+            return ListDocumentsPager(fetch_page, request, fetch_page(request))
+
+    usage = FirestoreUsage()
+    token = _usage.set(usage)
+    try:
+        pager = _InstrumentedApi(Api()).list_documents(
+            request=ListDocumentsRequest(parent="projects/p/databases/d/documents")
+        )
+        names = [document.name for document in pager]
+    finally:
+        _usage.reset(token)
+
+    assert names == ["d0", "d1", "d2"]
+    assert (usage.rpcs, usage.reads) == (3, 3)
+
+
+def test_usage_is_logged_as_structured_json(
+    db: FakeClient,
+    client: FlaskClient,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    monkeypatch.setattr(instrumentation, "LOG_USAGE", True)
+    caplog.handler.setFormatter(StructuredFormatter())
+    instrumentation.logger.addHandler(caplog.handler)
+    try:
+        client.get("/exams")
+    finally:
+        instrumentation.logger.removeHandler(caplog.handler)
+
+    entry = json.loads(caplog.text)
+    assert entry["severity"] == "INFO"
+    assert entry["message"].startswith("list_exams 200: ")
+    assert entry["path"] == "/exams"
+    assert set(entry["firestore"]) == {"reads", "writes", "rpcs", "ms"}
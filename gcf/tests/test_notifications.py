@@ -0,0 +1,173 @@
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+from common import notifications
+from fake_firestore import FakeClient
+from flask.testing import FlaskClient
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def seed(db: FakeClient, user_id: str, *read: bool) -> list[str]:
+    """Write notifications directly, bypassing the counter, one minute apart."""
+    ids = []
+    for i, is_read in enumerate(read):
+        ref = notifications.notifications_ref(db, user_id).document(f"n{i}")
+        ref.set({"read": is_read, "timestamp": START + timedelta(minutes=i)})
+        ids.append(ref.id)
+    return ids
+
+
+def stored_count(db: FakeClient, user_id: str) -> int | None:
+    counter = notifications.counter_ref(db, user_id).get()
+    return counter.to_dict()["unread"] if counter.exists else None
+
+
+def test_unread_count_seeds_a_missing_counter(db: FakeClient) -> None:
+    seed(db, "alice", False, True, False)
+
+    assert notifications.unread_count(db, "alice") == 2
+    assert stored_count(db, "alice") == 2
+
+    db.reset_stats()
+    assert notifications.unread_count(db, "alice") == 2
+    assert db.reset_stats()["reads"] == 1
+
+
+def test_add_notification_counts_itself(db: FakeClient) -> None:
+    seed(db, "alice", False)
+
+    # The first write seeds the counter, including notifications written before.
+    notifications.add_notification(db, "alice", {"message": "one"})
+    assert stored_count(db, "alice") == 2
+
+    notifications.add_notification(db, "alice", {"message": "two"})
+    notifications.add_notification(db, "alice", {"message": "old", "read": True})
+    assert stored_count(db, "alice") == 3
+    assert notifications.unread_count(db, "alice") == 3
+
+
+def test_mark_read_decrements_once_per_flip(db: FakeClient) -> None:
+    ids = seed(db, "alice", False, False, True)
+    ref = notifications.notifications_ref(db, "alice").document
+
+    # Seeds from the count taken before this transaction's own flips.
+    assert notifications.mark_read(db, "alice", [ref(ids[0])]) == 1
+    assert stored_count(db, "alice") == 1
+
+    # Already read, repeated and missing notifications leave the counter alone.
+    flipped = notifications.mark_read(
+        db, "alice", [ref(ids[0]), ref(ids[1]), ref(ids[1]), ref(ids[2]), ref("gone")]
+    )
+    assert flipped == 1
+    assert stored_count(db, "alice") == 0
+    assert notifications.unread_count(db, "alice") == 0
+
+
+def test_mark_all_read_before_a_timestamp(
+    db: FakeClient, client: FlaskClient, auth_headers: Callable[..., dict]
+) -> None:
+    seed(db, "alice", False, False, False, True)
+    headers = auth_headers("alice")
+    assert client.get("/notifications/unread-count", headers=headers).get_json() == {
+        "unread": 3
+    }
+
+    cutoff = (START + timedelta(minutes=2)).isoformat().replace("+00:00", "Z")
+    response = client.post(
+        "/update-notification/batch", headers=headers, json={"before": cutoff}
+    )
+
+    assert response.get_json()["updated"] == 2
+    assert client.get("/notifications/unread-count", headers=headers).get_json() == {
+        "unread": 1
+    }
+
+
+def test_mark_one_read_over_http(
+    db: FakeClient, client: FlaskClient, auth_headers: Callable[..., dict]
+) -> None:
+    ids = seed(db, "alice", False, False)
+    headers = auth_headers("alice")
+
+    response = client.post(
+        "/update-notification", headers=headers, json={"notification_id": ids[1]}
+    )
+
+    assert response.status_code == 200
+    assert stored_count(db, "alice") == 1
+    missing = client.post("/update-notification", headers=headers, json={})
+    assert missing.status_code == 400
+
+
+def test_mark_many_read_rejects_bad_ids(
+    db: FakeClient, client: FlaskClient, auth_headers: Callable[..., dict]
+) -> None:
+    ids = seed(db, "alice", False, False)
+    headers = auth_headers("alice")
+
+    for bad in [ids[0], [ids[0], 7], [ids[0], ""], ["a/b"], [None]]:
+        response = client.post(
+            "/update-notification/batch",
+            headers=headers,
+            json={"notification_ids": bad},
+        )
+        assert response.status_code == 400
+        assert "error" in response.get_json()
+
+    assert stored_count(db, "alice") is None
+
+
+def test_mark_many_read_by_ids_or_timestamp(
+    db: FakeClient, client: FlaskClient, auth_headers: Callable[..., dict]
+) -> None:
+    inbox = db.collection("users").document("alice").collection("notifications")
+    for i in range(4):
+        inbox.document(f"n{i}").set(
+            {"read": False, "timestamp": START + timedelta(minutes=i)}
+        )
+    headers = auth_headers("alice")
+
+    by_ids = client.post(
+        "/update-notification/batch",
+        headers=headers,
+        json={"notification_ids": ["n3"]},
+    )
+    cutoff = (START + timedelta(minutes=2)).isoformat().replace("+00:00", "Z")
+    by_timestamp = client.post(
+        "/update-notification/batch", headers=headers, json={"before": cutoff}
+    )
+
+    assert by_ids.get_json()["updated"] == 1
+    assert by_timestamp.get_json()["updated"] == 2
+    read = [doc.get("read") for doc in inbox.order_by("timestamp").stream()]
+    assert read == [True, True, False, True]
+    missing = client.post("/update-notification/batch", headers=headers, json={})
+    assert missing.status_code == 400
+
+
+def test_unread_count_follows_mark_read(
+    db: FakeClient, client: FlaskClient, auth_headers: Callable[..., dict]
+) -> None:
+    inbox = db.collection("users").document("alice").collection("notifications")
+    for i, read in enumerate([False, False, True]):
+        inbox.document(f"n{i}").set({"read": read, "timestamp": START})
+    headers = auth_headers("alice")
+
+    # A missing counter is seeded from a count of the unread notifications.
+    assert client.get("/notifications/unread-count", headers=headers).get_json() == {
+        "unread": 2
+    }
+    # Already read, repeated and missing notifications do not move it.
+    response = client.post(
+        "/update-notification/batch",
+        headers=headers,
+        json={"notification_ids": ["n0", "n0", "n2", "gone"]},
+    )
+    assert response.status_code == 200
+
+    db.reset_stats()
+    assert client.get("/notifications/unread-count", headers=headers).get_json() == {
+        "unread": 1
+    }
+    assert db.reset_stats()["reads"] == 1
@@ -0,0 +1,102 @@
+import json
+from collections.abc import Callable
+
+import pytest
+from common.pagination import (
+    MAX_PAGE_SIZE,
+    decode_page_token,
+    encode_page_token,
+    parse_page_size,
+)
+from fake_firestore import FakeClient
+from flask.testing import FlaskClient
+
+
+def add_progress(db: FakeClient, user_id: str, count: int) -> None:
+    progress = db.collection("users").document(user_id).collection("progress")
+    for number in range(count):
+        progress.document(f"p{number:03d}").set({"score": number})
+
+
+def test_page_tokens_round_trip() -> None:
+    token = encode_page_token("AMC10-2023-A/ü")
+
+    assert decode_page_token(token) == "AMC10-2023-A/ü"
+    with pytest.raises(ValueError):
+        decode_page_token("not base64!")
+    with pytest.raises(ValueError):
+        decode_page_token("")
+
+
+def test_parse_page_size() -> None:
+    assert parse_page_size("25") == 25
+    with pytest.raises(ValueError):
+        parse_page_size("0")
+    with pytest.raises(ValueError):
+        parse_page_size(str(MAX_PAGE_SIZE + 1))
+    with pytest.raises(ValueError):
+        parse_page_size("ten")
+
+
+def test_user_progress_pages_through_everything(
+    db: FakeClient, client: FlaskClient, auth_headers: Callable[..., dict]
+) -> None:
+    add_progress(db, "alice", 5)
+    headers = auth_headers("alice")
+
+    ids, query = [], {"limit": "2"}
+    while True:
+        page = client.get("/user-progress", headers=headers, query_string=query)
+        assert page.status_code == 200
+        body = page.get_json()
+        ids += [item["id"] for item in body["progress"]]
+        if body["next_page_token"] is None:
+            break
+        query = {"limit": "2", "start_after": body["next_page_token"]}
+
+    assert ids == [f"p{number:03d}" for number in range(5)]
+
+
+def test_user_progress_rejects_bad_cursors(
+    db: FakeClient, client: FlaskClient, auth_headers: Callable[..., dict]
+) -> None:
+    response = client.get(
+        "/user-progress",
+        headers=auth_headers("alice"),
+        query_string={"limit": "2", "start_after": "%%%"},
+    )
+
+    assert response.status_code == 400
+
+
+def test_user_progress_streams_ndjson(
+    db: FakeClient, client: FlaskClient, auth_headers: Callable[..., dict]
+) -> None:
+    add_progress(db, "alice", 3)
+
+    response = client.get(
+        "/user-progress",
+        headers={**auth_headers("alice"), "Accept": "application/x-ndjson"},
+        query_string={"limit": "2"},
+    )
+
+    lines = [json.loads(line) for line in response.get_data(as_text=True).split()]
+    assert lines == [
+        {"id": "p000", "score": 0},
+        {"id": "p001", "score": 1},
+        {"next_page_token": encode_page_token("p001")},
+    ]
+
+
+def test_user_progress_without_paging_is_a_bare_array(
+    db: FakeClient, client: FlaskClient, auth_headers: Callable[..., dict]
+) -> None:
+    add_progress(db, "alice", 3)
+
+    response = client.get("/user-progress", headers=auth_headers("alice"))
+
+    assert response.get_json() == [
+        {"id": "p000", "score": 0},
+        {"id": "p001", "score": 1},
+        {"id": "p002", "score": 2},
+    ]
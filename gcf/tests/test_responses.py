@@ -0,0 +1,77 @@
+import gzip
+
+import brotli
+from common.compression import MIN_SIZE, compress, compressed
+from common.responses import cached_json_response, serialize_payload
+from flask import Flask, Response, jsonify, request
+
+app = Flask(__name__)
+HEADERS = {"Access-Control-Allow-Origin": "*"}
+
+
+def test_serialize_payload_is_canonical() -> None:
+    first = serialize_payload({"b": 1, "a": [1, 2]})
+    second = serialize_payload({"a": [1, 2], "b": 1})
+
+    assert first.body == b'{"a":[1,2],"b":1}'
+    assert first.etag == second.etag
+
+
+def test_compress_round_trips() -> None:
+    body = b"x" * 5000
+
+    assert gzip.decompress(compress(body, "gzip")) == body
+    assert brotli.decompress(compress(body, "br", best=True)) == body
+
+
+def test_cached_json_response_compresses_large_payloads() -> None:
+    cached = serialize_payload({"text": "x" * MIN_SIZE})
+
+    with app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+        response = cached_json_response(request, cached, HEADERS, 300)
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.headers["ETag"] == f'"{cached.etag}-gzip"'
+    assert response.cache_control.max_age == 300
+    assert gzip.decompress(response.get_data()) == cached.body
+
+
+def test_cached_json_response_answers_304_per_encoding() -> None:
+    cached = serialize_payload({"text": "x" * MIN_SIZE})
+    headers = {"Accept-Encoding": "br", "If-None-Match": f'"{cached.etag}-br"'}
+
+    with app.test_request_context(headers=headers):
+        not_modified = cached_json_response(request, cached, HEADERS, 300)
+    with app.test_request_context(headers={**headers, "Accept-Encoding": "identity"}):
+        identity = cached_json_response(request, cached, HEADERS, 300)
+
+    assert not_modified.status_code == 304
+    assert identity.status_code == 200
+    assert identity.get_data() == cached.body
+
+
+def test_small_payloads_are_not_compressed() -> None:
+    cached = serialize_payload({"ok": True})
+
+    with app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+        response = cached_json_response(request, cached, HEADERS, 300)
+
+    assert "Content-Encoding" not in response.headers
+    assert response.get_data() == cached.body
+
+
+def test_compressed_only_touches_large_successful_responses() -> None:
+    @compressed
+    def handler(request, status: int, size: int) -> Response:
+        return jsonify({"text": "x" * size}), status, HEADERS
+
+    with app.test_request_context(headers={"Accept-Encoding": "br, gzip"}):
+        large = handler(request, 200, MIN_SIZE)
+        small = handler(request, 200, 10)
+        failed = handler(request, 500, MIN_SIZE)
+
+    assert large.headers["Content-Encoding"] == "br"
+    assert large.headers["Access-Control-Allow-Origin"] == "*"
+    assert "Content-Encoding" not in small.headers
+    assert "Content-Encoding" not in failed.headers
@@ -0,0 +1,178 @@
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+
+import pytest
+from common.revocation import (
+    BLACKLIST_COLLECTION,
+    RETRY_BACKOFF,
+    BloomFilter,
+    RevocationList,
+)
+from fake_firestore import DocumentReference, FakeClient, Query
+from flask.testing import FlaskClient
+from google.api_core.exceptions import ServiceUnavailable
+
+
+def revoke(db: FakeClient, token: str) -> None:
+    db.collection(BLACKLIST_COLLECTION).document(token).set(
+        {"exp": int(time.time()) + 3600, "revoked_at": datetime.now(timezone.utc)}
+    )
+
+
+def test_bloom_filter_has_no_false_negatives() -> None:
+    bloom = BloomFilter(capacity=1000)
+    tokens = [f"token-{i}" for i in range(1000)]
+    for token in tokens:
+        bloom.add(token)
+
+    assert all(token in bloom for token in tokens)
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 50
+
+
+def test_is_revoked_confirms_filter_hits(db: FakeClient) -> None:
+    revoke(db, "revoked")
+    revocations = RevocationList()
+
+    assert revocations.is_revoked(db, "revoked")
+    db.reset_stats()
+    assert not revocations.is_revoked(db, "valid")
+    assert db.reset_stats()["reads"] == 0
+
+
+def test_expired_entries_are_left_out_of_a_rebuild(db: FakeClient) -> None:
+    db.collection(BLACKLIST_COLLECTION).document("expired").set(
+        {"exp": int(time.time()) - 60, "revoked_at": datetime.now(timezone.utc)}
+    )
+    revocations = RevocationList()
+
+    assert not revocations.is_revoked(db, "expired")
+
+
+def test_logout_revokes_the_token(
+    db: FakeClient, client: FlaskClient, auth_headers: Callable[..., dict]
+) -> None:
+    db.collection("users").document("alice").set({"name": "Alice"})
+    headers = auth_headers("alice")
+    assert client.get("/user", headers=headers).status_code == 200
+
+    assert client.post("/logout", headers=headers).status_code == 200
+
+    response = client.get("/user", headers=headers)
+    assert response.status_code == 401
+    assert response.get_json() == {"error": "Token has been revoked"}
+    assert client.get("/user", headers=auth_headers("alice")).status_code == 200
+
+
+def test_failed_refresh_keeps_the_filter_and_backs_off(
+    db: FakeClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    clock = [0.0]
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+    revoke(db, "revoked")
+    revocations = RevocationList(refresh_interval=30, rebuild_interval=0)
+    assert revocations.is_revoked(db, "revoked")
+
+    def unavailable(collection_id: str):
+        raise ServiceUnavailable("Firestore is down")
+
+    with pytest.MonkeyPatch.context() as outage:
+        outage.setattr(db, "collection", unavailable)
+        clock[0] += 30
+        assert not revocations.is_revoked(db, "valid")
+        assert revocations._failures == 1
+        # Backing off: no retry until the delay has passed.
+        assert not revocations.is_revoked(db, "valid")
+        assert revocations._failures == 1
+        clock[0] += RETRY_BACKOFF
+        assert not revocations.is_revoked(db, "valid")
+        assert revocations._failures == 2
+        assert "revoked" in revocations._filter
+
+    clock[0] += 2 * RETRY_BACKOFF
+    assert revocations.is_revoked(db, "revoked")
+    assert revocations._failures == 0
+
+
+def test_requests_during_the_initial_rebuild_read_the_blacklist(
+    db: FakeClient,
+) -> None:
+    revoke(db, "revoked")
+    revocations = RevocationList()
+    started, release = threading.Event(), threading.Event()
+    stream = Query.stream
+
+    def slow_stream(query, transaction=None):
+        started.set()
+        release.wait(5)
+        return stream(query, transaction)
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(Query, "stream", slow_stream)
+        rebuild = threading.Thread(target=revocations.is_revoked, args=(db, "valid"))
+        rebuild.start()
+        assert started.wait(5)
+        # The rebuild holds the lock and the filter is still empty.
+        try:
+            assert revocations.is_revoked(db, "revoked")
+            assert not revocations.is_revoked(db, "valid")
+        finally:
+            release.set()
+            rebuild.join()
+
+    db.reset_stats()
+    assert revocations.is_revoked(db, "revoked")
+    assert not revocations.is_revoked(db, "valid")
+    assert db.reset_stats()["reads"] == 1
+
+
+def test_failing_initial_rebuild_reads_the_blacklist(
+    db: FakeClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    revoke(db, "revoked")
+    revocations = RevocationList()
+
+    def unavailable(query, transaction=None):
+        raise ServiceUnavailable("Firestore is down")
+
+    monkeypatch.setattr(Query, "stream", unavailable)
+
+    assert revocations.is_revoked(db, "revoked")
+    assert revocations._failures == 1
+
+
+def test_rebuild_keeps_tokens_revoked_while_it_ran(db: FakeClient) -> None:
+    revocations = RevocationList(rebuild_interval=0)
+    stream = Query.stream
+
+    def revoke_mid_query(query, transaction=None):
+        revocations.revoke_locally("mid-rebuild")
+        return stream(query, transaction)
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(Query, "stream", revoke_mid_query)
+        revocations._maybe_refresh(db)
+
+    assert "mid-rebuild" in revocations._filter
+
+
+def test_require_auth_answers_firestore_errors_with_cors_headers(
+    db: FakeClient,
+    client: FlaskClient,
+    auth_headers: Callable[..., dict],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    headers = auth_headers("alice")
+    revoke(db, headers["Authorization"].split(" ")[1])
+    client.get("/user", headers=headers)
+
+    def unavailable(self, field_paths=None, transaction=None):
+        raise ServiceUnavailable("Firestore is down")
+
+    monkeypatch.setattr(DocumentReference, "get", unavailable)
+    response = client.get("/user", headers=headers)
+
+    assert response.status_code == 500
+    assert response.headers["Access-Control-Allow-Origin"] == "*"
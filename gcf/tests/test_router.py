@@ -0,0 +1,18 @@
+import main as router
+from flask.testing import FlaskClient
+
+
+def test_unknown_paths_are_404(client: FlaskClient) -> None:
+    response = client.get("/nowhere")
+
+    assert response.status_code == 404
+    assert response.get_json() == {"error": "Unknown path: /nowhere"}
+    assert response.headers["Access-Control-Allow-Origin"] == "*"
+
+
+def test_routes_share_one_module_per_function(client: FlaskClient) -> None:
+    listing = router.resolve("/notifications/")
+    count = router.resolve("/notifications/unread-count")
+
+    assert listing.__module__ == count.__module__
+    assert list(router._modules) == ["notifications"]
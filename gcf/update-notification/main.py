@@ -1,52 +1,100 @@
-import jwt
-from flask import Request, Response, jsonify
-from google.cloud import firestore_v1
-
-db = firestore_v1.Client(database="grindolympiads")
-SECRET_KEY = (
-    "a_secure_random_secret_key"  # Use the same secret key as in the login function
-)
-
+from datetime import datetime, timezone
 
-def mark_notification_read(request: Request) -> Response:
-    headers = {
-        "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Methods": "POST",
-        "Access-Control-Allow-Headers": "Authorization, Content-Type",
-    }
-    if request.method == "OPTIONS":
-        return Response(status=204, headers=headers)
+from common.auth import require_auth
+from common.firestore import get_client
+from common.instrumentation import instrumented
+from common.notifications import mark_read, notifications_ref
+from flask import Request, Response, jsonify
 
-    # Verify JWT token
-    auth_header = request.headers.get("Authorization")
-    if not auth_header:
-        return jsonify({"error": "Authorization header missing"}), 401, headers
+HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "POST",
+    "Access-Control-Allow-Headers": "Authorization, Content-Type",
+}
 
-    try:
-        token = auth_header.split(" ")[1]
-        decoded_token = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        user_id = decoded_token["user_id"]
-    except jwt.ExpiredSignatureError:
-        return jsonify({"error": "Token has expired"}), 401, headers
-    except jwt.InvalidTokenError:
-        return jsonify({"error": "Invalid token"}), 401, headers
 
+@instrumented
+@require_auth(HEADERS)
+def mark_notification_read(request: Request, user_id: str) -> Response:
     try:
         request_json = request.get_json()
         notification_id = request_json.get("notification_id")
 
         if not notification_id:
-            return jsonify({"error": "Notification ID is required"}), 400, headers
-
-        # Update the notification for the authenticated user
-        notification_ref = (
-            db.collection("users")
-            .document(user_id)
-            .collection("notifications")
-            .document(notification_id)
+            return jsonify({"error": "Notification ID is required"}), 400, HEADERS
+
+        # Update the notification and unread counter for the authenticated user
+        db = get_client()
+        mark_read(
+            db, user_id, [notifications_ref(db, user_id).document(notification_id)]
         )
-        notification_ref.update({"read": True})
 
-        return jsonify({"message": "Notification marked as read"}), 200, headers
+        return jsonify({"message": "Notification marked as read"}), 200, HEADERS
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500, HEADERS
+
+
+@instrumented
+@require_auth(HEADERS)
+def mark_notifications_read(request: Request, user_id: str) -> Response:
+    """Mark many notifications read in one call.
+
+    Accepts either ``notification_ids`` (a list of IDs) or ``before`` (an
+    ISO-8601 timestamp; every unread notification older than it is marked).
+    """
+    try:
+        request_json = request.get_json()
+        notification_ids = request_json.get("notification_ids")
+        before = request_json.get("before")
+
+        if not notification_ids and not before:
+            return (
+                jsonify({"error": "notification_ids or before is required"}),
+                400,
+                HEADERS,
+            )
+        if notification_ids and not isinstance(notification_ids, list):
+            return jsonify({"error": "notification_ids must be a list"}), 400, HEADERS
+        if notification_ids and not all(
+            isinstance(nid, str) and nid and "/" not in nid for nid in notification_ids
+        ):
+            return (
+                jsonify({"error": "notification_ids must be notification IDs"}),
+                400,
+                HEADERS,
+            )
+
+        db = get_client()
+        user_notifications = notifications_ref(db, user_id)
+        if notification_ids:
+            refs = (user_notifications.document(nid) for nid in notification_ids)
+        else:
+            try:
+                cutoff = parse_timestamp(before)
+            except ValueError:
+                return jsonify({"error": f"Invalid timestamp: {before}"}), 400, HEADERS
+            # Needs a composite index on (read, timestamp).
+            refs = (
+                doc.reference
+                for doc in user_notifications.where("read", "==", False)
+                .where("timestamp", "<", cutoff)
+                .select([])
+                .stream()
+            )
+
+        updated = mark_read(db, user_id, refs)
+        return (
+            jsonify({"message": "Notifications marked as read", "updated": updated}),
+            200,
+            HEADERS,
+        )
     except Exception as e:
-        return jsonify({"error": str(e)}), 500, headers
+        return jsonify({"error": str(e)}), 500, HEADERS
+
+
+def parse_timestamp(value: str) -> datetime:
+    # datetime.fromisoformat only accepts a trailing "Z" from Python 3.11.
+    timestamp = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp
@@ -1,40 +1,94 @@
-import jwt
-from flask import Request, Response, jsonify
-from google.cloud import firestore_v1
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
 
-db = firestore_v1.Client(database="grindolympiads")
-SECRET_KEY = (
-    "a_secure_random_secret_key"  # Use the same secret key as in the login function
+from common.auth import require_auth
+from common.compression import compressed
+from common.firestore import get_client
+from common.instrumentation import instrumented
+from common.pagination import (
+    decode_page_token,
+    encode_page_token,
+    page_query,
+    parse_page_size,
+    split_page,
 )
+from common.responses import ndjson_response, wants_ndjson
+from flask import Request, Response, jsonify
+
+if TYPE_CHECKING:
+    from google.cloud import firestore_v1
 
+HEADERS = {"Access-Control-Allow-Origin": "*"}
 
-def user_progress(request: Request) -> Response:
-    headers = {"Access-Control-Allow-Origin": "*"}
 
-    # Verify JWT token
-    auth_header = request.headers.get("Authorization")
-    if not auth_header:
-        return jsonify({"error": "Authorization header missing"}), 401, headers
+@instrumented
+@compressed
+@require_auth(HEADERS)
+def user_progress(request: Request, user_id: str) -> Response:
+    """Progress items, as a bare array unless the client asks for a page.
 
+    With ``limit`` or ``start_after`` the response is ``{"progress": [...],
+    "next_page_token": ...}``; without either it is the full list, which is
+    what existing callers expect.
+    """
+    paged = "limit" in request.args or "start_after" in request.args
     try:
-        token = auth_header.split(" ")[1]
-        decoded_token = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        user_id = decoded_token["user_id"]
-    except jwt.ExpiredSignatureError:
-        return jsonify({"error": "Token has expired"}), 401, headers
-    except jwt.InvalidTokenError:
-        return jsonify({"error": "Invalid token"}), 401, headers
+        limit = parse_page_size(request.args.get("limit"))
+        start_after = request.args.get("start_after")
+        if start_after:
+            start_after = decode_page_token(start_after)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400, HEADERS
 
     try:
-        progress_ref = db.collection("users").document(user_id).collection("progress")
-        progress_docs = progress_ref.stream()
+        progress_ref = (
+            get_client().collection("users").document(user_id).collection("progress")
+        )
+        if not paged:
+            if wants_ndjson(request):
+                return ndjson_response(progress_items(progress_ref.stream()), HEADERS)
+            return jsonify(list(progress_items(progress_ref.stream()))), 200, HEADERS
 
-        progress_data = []
-        for doc in progress_docs:
-            progress_item = doc.to_dict()
-            progress_item["id"] = doc.id
-            progress_data.append(progress_item)
+        if wants_ndjson(request):
+            return ndjson_response(
+                stream_progress(page_query(progress_ref, limit, start_after), limit),
+                HEADERS,
+            )
 
-        return jsonify(progress_data), 200, headers
+        progress_docs, next_page_token = split_page(
+            list(page_query(progress_ref, limit, start_after).stream()), limit
+        )
+        return (
+            jsonify(
+                {
+                    "progress": list(progress_items(progress_docs)),
+                    "next_page_token": next_page_token,
+                }
+            ),
+            200,
+            HEADERS,
+        )
     except Exception as e:
-        return jsonify({"error": str(e)}), 500, headers
+        return jsonify({"error": str(e)}), 500, HEADERS
+
+
+def progress_items(docs: Iterable[firestore_v1.DocumentSnapshot]):
+    for doc in docs:
+        progress_item = doc.to_dict()
+        progress_item["id"] = doc.id
+        yield progress_item
+
+
+def stream_progress(query: firestore_v1.Query, limit: int):
+    """Yield progress items as they arrive, then the next-page token if any."""
+    last_id = None
+    for count, doc in enumerate(query.stream()):
+        if count == limit:
+            yield {"next_page_token": encode_page_token(last_id)}
+            return
+        progress_item = doc.to_dict()
+        progress_item["id"] = doc.id
+        last_id = doc.id
+        yield progress_item
@@ -6,6 +6,10 @@ terraform {
       source  = "hashicorp/google"
       version = "~> 4.0"
     }
+    archive = {
+      source  = "hashicorp/archive"
+      version = "~> 2.4"
+    }
   }
 }
 
@@ -38,6 +42,14 @@ variable "cloud_functions" {
       timeout     = 300
       source_dir  = "gcf/admin/users"
     },
+    bootstrap = {
+      name        = "bootstrap"
+      description = "Function to load user session data"
+      entry_point = "session_bootstrap"
+      memory      = 256
+      timeout     = 300
+      source_dir  = "gcf/bootstrap"
+    },
     exam_data = {
       name        = "exam_data"
       description = "Function to handle exam data"
@@ -105,6 +117,42 @@ variable "cloud_functions" {
   }
 }
 
+# Functions that import gcf/common reach it through a "common -> ../common"
+# symlink, which the Cloud Functions builders do not follow. Those are
+# deployed from zip archives instead, built here with the symlinked directory
+# stored as a copy (what `cp -rL` would do). The rest deploy from the
+# repository as before.
+locals {
+  vendored_functions = {
+    for key, function in var.cloud_functions : key => function
+    if fileexists("${path.module}/../${function.source_dir}/common/__init__.py")
+  }
+}
+
+resource "google_storage_bucket" "function_sources" {
+  name                        = "olympiads-function-sources"
+  location                    = "US"
+  uniform_bucket_level_access = true
+}
+
+data "archive_file" "function_sources" {
+  for_each    = local.vendored_functions
+  type        = "zip"
+  source_dir  = "${path.module}/../${each.value.source_dir}"
+  output_path = "${path.module}/build/${each.key}.zip"
+  excludes    = ["__pycache__", "common/__pycache__"]
+
+  exclude_symlink_directories = false
+}
+
+resource "google_storage_bucket_object" "function_sources" {
+  for_each = data.archive_file.function_sources
+  # Content-addressed, so a changed archive redeploys its function.
+  name   = "${each.key}-${each.value.output_md5}.zip"
+  bucket = google_storage_bucket.function_sources.name
+  source = each.value.output_path
+}
+
 # Cloud Functions
 resource "google_cloudfunctions_function" "functions" {
   for_each    = var.cloud_functions
@@ -113,8 +161,22 @@ resource "google_cloudfunctions_function" "functions" {
   runtime     = "python310"
 
   available_memory_mb = each.value.memory
-  source_repository {
-    url = "https://source.developers.google.com/projects/${google_sourcerepo_repository.repo.project}/repos/${google_sourcerepo_repository.repo.name}/moveable-aliases/main/paths/${each.value.source_dir}"
+
+  source_archive_bucket = (
+    contains(keys(local.vendored_functions), each.key)
+    ? google_storage_bucket.function_sources.name
+    : null
+  )
+  source_archive_object = (
+    contains(keys(local.vendored_functions), each.key)
+    ? google_storage_bucket_object.function_sources[each.key].name
+    : null
+  )
+  dynamic "source_repository" {
+    for_each = contains(keys(local.vendored_functions), each.key) ? [] : [each.value]
+    content {
+      url = "https://source.developers.google.com/projects/${google_sourcerepo_repository.repo.project}/repos/${google_sourcerepo_repository.repo.name}/moveable-aliases/main/paths/${source_repository.value.source_dir}"
+    }
   }
   trigger_http     = true
   entry_point      = each.value.entry_point
@@ -122,6 +184,132 @@ resource "google_cloudfunctions_function" "functions" {
   ingress_settings = "ALLOW_ALL"
 }
 
+# The exam catalog shards keep one row per exam in their "exams" map. Nothing
+# queries those rows, and indexing them would count every row's fields
+# against Firestore's 40,000 index entries per document. Subfields inherit the
+# exemption.
+resource "google_firestore_field" "catalog_exams" {
+  database   = "grindolympiads"
+  collection = "catalog"
+  field      = "exams"
+
+  # An empty index_config turns off the automatic single-field indexes.
+  index_config {}
+}
+
+# Keeps the exam catalog current as exams change. Firestore triggers on a named
+# database need a 2nd gen function, whose Eventarc trigger has to live in the
+# database's location.
+variable "firestore_location" {
+  type    = string
+  default = "nam5"
+}
+
+data "archive_file" "exam_catalog" {
+  type        = "zip"
+  source_dir  = "${path.module}/../gcf/exam-catalog"
+  output_path = "${path.module}/build/exam_catalog.zip"
+  excludes    = ["__pycache__", "common/__pycache__"]
+
+  exclude_symlink_directories = false
+}
+
+resource "google_storage_bucket_object" "exam_catalog" {
+  name   = "exam_catalog-${data.archive_file.exam_catalog.output_md5}.zip"
+  bucket = google_storage_bucket.function_sources.name
+  source = data.archive_file.exam_catalog.output_path
+}
+
+resource "google_cloudfunctions2_function" "exam_catalog" {
+  name        = "exam_catalog"
+  location    = "us-central1"
+  description = "Function to sync the exam catalog on exam Info writes"
+
+  build_config {
+    runtime     = "python310"
+    entry_point = "sync_exam_catalog"
+    source {
+      storage_source {
+        bucket = google_storage_bucket.function_sources.name
+        object = google_storage_bucket_object.exam_catalog.name
+      }
+    }
+  }
+
+  service_config {
+    available_memory = "256M"
+    timeout_seconds  = 300
+    ingress_settings = "ALLOW_INTERNAL_ONLY"
+  }
+
+  event_trigger {
+    trigger_region = var.firestore_location
+    event_type     = "google.cloud.firestore.document.v1.written"
+    retry_policy   = "RETRY_POLICY_RETRY"
+    event_filters {
+      attribute = "database"
+      value     = "grindolympiads"
+    }
+    event_filters {
+      attribute = "document"
+      value     = "{competition}/{year}/{exam}/Info"
+      operator  = "match-path-pattern"
+    }
+  }
+}
+
+# The trigger only sees Info writes, so exams created without an Info
+# document reach the catalog through this nightly full rebuild.
+resource "google_cloudfunctions2_function" "exam_catalog_rebuild" {
+  name        = "exam_catalog_rebuild"
+  location    = "us-central1"
+  description = "Function to rebuild the exam catalog from the exam tree"
+
+  build_config {
+    runtime     = "python310"
+    entry_point = "rebuild_exam_catalog"
+    source {
+      storage_source {
+        bucket = google_storage_bucket.function_sources.name
+        object = google_storage_bucket_object.exam_catalog.name
+      }
+    }
+  }
+
+  service_config {
+    available_memory = "256M"
+    timeout_seconds  = 540
+  }
+}
+
+resource "google_service_account" "exam_catalog_scheduler" {
+  account_id   = "exam-catalog-scheduler"
+  display_name = "Invokes the nightly exam catalog rebuild"
+}
+
+resource "google_cloud_run_service_iam_member" "exam_catalog_rebuild_invoker" {
+  location = google_cloudfunctions2_function.exam_catalog_rebuild.location
+  service  = google_cloudfunctions2_function.exam_catalog_rebuild.service_config[0].service
+  role     = "roles/run.invoker"
+  member   = "serviceAccount:${google_service_account.exam_catalog_scheduler.email}"
+}
+
+resource "google_cloud_scheduler_job" "exam_catalog_rebuild" {
+  name      = "exam-catalog-rebuild"
+  region    = "us-central1"
+  schedule  = "0 4 * * *"
+  time_zone = "Etc/UTC"
+
+  http_target {
+    http_method = "POST"
+    uri         = google_cloudfunctions2_function.exam_catalog_rebuild.service_config[0].uri
+    oidc_token {
+      service_account_email = google_service_account.exam_catalog_scheduler.email
+      audience              = google_cloudfunctions2_function.exam_catalog_rebuild.service_config[0].uri
+    }
+  }
+}
+
 # IAM entries for all users to invoke the functions
 resource "google_cloudfunctions_function_iam_member" "function_invokers" {
   for_each       = google_cloudfunctions_function.functions